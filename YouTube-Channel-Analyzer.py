@@ -3,17 +3,35 @@ from tkinter import ttk, messagebox, filedialog
 import threading
 import json
 import os
+import sys
 import logging
-import pickle
 from datetime import datetime
 import re
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-import pandas as pd
-import time
+import numpy as np
 import webbrowser
 from collections import defaultdict
-from functools import lru_cache
+
+from channel_loader import ChannelLoader, main as batch_main
+from exporter import DEFAULT_COLUMNS, EXPORT_COLUMNS, export_videos
+from filter_engine import VideoColumns
+from quota import QUOTA_FILE, QuotaLedger
+from record_journal import compact_journal
+from records import format_duration
+from session_store import LegacySessionError
+from title_index import TitleQuery
+from video_cache import VideoCache
+from virtual_list import VirtualTreeview
+
+# Intestazioni ordinabili -> colonna di VideoColumns
+SORT_COLUMNS = {
+    'Views': 'views',
+    'Like': 'likes',
+    'Data': 'published',
+    'Durata': 'duration_seconds'
+}
+
+# Attesa dopo l'ultima modifica di un filtro prima di rivalutarlo (ms)
+FILTER_DEBOUNCE_MS = 300
 
 # Configurazione logging
 logging.basicConfig(
@@ -34,34 +52,28 @@ class YouTubeAnalyzerGUI:
         # Variabili
         self.api_key = tk.StringVar()
         self.channel_url = tk.StringVar()
-        self.channel_data = None
-        self.videos = []
         self.filtered_videos = []
-        self.api_calls_count = 0
-        self.youtube = None  # Cache dell'istanza YouTube API
-        
-        # Cache per ottimizzazione
-        self._video_cache = {}
-        self._search_cache = defaultdict(set)
-        
-        # Rate limiting
-        self.last_api_call = 0
-        self.api_call_delay = 0.1  # 100ms tra le chiamate (default)
-        self.aggressive_mode = False  # Per strategia Complete
+        # Video mostrati nella lista: indici nella lista di video di riferimento
+        self._view_videos = []
+        self.view_indices = np.arange(0)
+        # Ordinamento della lista: colonna di VideoColumns e direzione
+        self.sort_column = None
+        self.sort_descending = True
+        
+        # Filtri dal vivo: valutati da un worker, vale solo l'ultima richiesta
+        self._filters_lock = threading.Lock()  # Protegge colonne e posizioni condivise col worker
+        self._filter_generation = 0
+        self._filter_request = None
+        self._filter_wakeup = threading.Event()
+        self._filter_after_id = None
+        self._filter_worker = None
         
         # Inizializza variabili mancanti
         self.api_keys = []
         self.current_api_key_index = 0
-        self.session_state = None
         self.session_file = None
-        self.debug_info = {
-            'playlist_pages': 0,
-            'search_pages': 0,
-            'quota_errors': 0,
-            'other_errors': 0,
-            'last_error': '',
-            'strategies_used': []
-        }
+        self._columns = None  # VideoColumns dei video caricati per filtri e ordinamenti
+        self._title_positions = None  # (lista video, indice, dimensioni, posizioni) per le keyword
         
         # Carica configurazione se esiste
         self.load_config()
@@ -73,12 +85,52 @@ class YouTubeAnalyzerGUI:
             if self.api_key.get():
                 self.api_keys = [self.api_key.get()]
         
+        # Cache persistente dei metadati video, condivisa tra sessioni
+        try:
+            video_cache = VideoCache()
+        except Exception as e:
+            logging.error(f"Cache video non disponibile: {e}")
+            video_cache = None
+        
+        # Motore di caricamento headless: comunica con la GUI tramite eventi
+        self.loader = ChannelLoader(self.api_keys, self.current_api_key_index,
+                                    on_event=self.on_loader_event, video_cache=video_cache,
+                                    quota=QuotaLedger(QUOTA_FILE))
+        
         # Crea interfaccia
         self.create_widgets()
         
         # Stile
         self.setup_style()
         
+    @property
+    def channel_data(self):
+        return self.loader.channel_data
+    
+    @property
+    def videos(self):
+        return self.loader.videos
+    
+    def on_loader_event(self, event, data):
+        """Riceve gli eventi del loader (da thread di lavoro) e aggiorna la GUI"""
+        if event == 'status':
+            self.update_status(data['message'])
+        elif event == 'key_rotated':
+            def apply():
+                self.current_api_key_index = data['index']
+                self.api_key.set(data['key'])
+                self.update_api_status()
+            self.root.after(0, apply)
+    
+    def _sync_loader_keys(self):
+        """Allinea le API keys del loader a quelle configurate nella GUI"""
+        keys = list(self.api_keys)
+        current = self.api_key.get()
+        if current and current not in keys:
+            keys.insert(0, current)
+        self.loader.api_keys = keys
+        self.loader.current_api_key_index = keys.index(current) if current else self.current_api_key_index
+    
     def setup_style(self):
         """Configura lo stile dell'interfaccia"""
         style = ttk.Style()
@@ -231,6 +283,12 @@ class YouTubeAnalyzerGUI:
         ttk.Checkbutton(options_frame, text="Parola completa", 
                        variable=self.whole_word).pack(side=tk.LEFT)
         
+        # Filtri dal vivo: ogni modifica rivaluta i filtri dopo una breve pausa
+        for var in (self.keyword_var, self.search_mode, self.min_views_var, self.min_duration_var,
+                    self.max_duration_var, self.start_date_var, self.end_date_var,
+                    self.case_sensitive, self.whole_word):
+            var.trace_add('write', lambda *args: self._schedule_live_filters())
+        
         # Help text
         help_text = "Suggerimenti: virgola per separare | -parola per escludere | \"frase esatta\" | Durata: 5 o 5:30"
         ttk.Label(filter_frame, text=help_text, font=('Arial', 8, 'italic')).grid(
@@ -262,17 +320,16 @@ class YouTubeAnalyzerGUI:
         self.video_tree.column('Data', width=100)
         self.video_tree.column('Durata', width=80)
         
-        # Intestazioni
+        # Intestazioni (quelle numeriche ordinano la lista al click)
         self.video_tree.heading('#0', text='#')
         self.video_tree.heading('Titolo', text='Titolo')
-        self.video_tree.heading('Views', text='Views')
-        self.video_tree.heading('Like', text='Like')
-        self.video_tree.heading('Data', text='Data')
-        self.video_tree.heading('Durata', text='Durata')
+        for heading in SORT_COLUMNS:
+            self.video_tree.heading(heading, text=heading,
+                                    command=lambda h=heading: self.sort_videos(h))
         
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(video_frame, orient=tk.VERTICAL, command=self.video_tree.yview)
-        self.video_tree.configure(yscrollcommand=scrollbar.set)
+        # Scrollbar: la lista è virtuale, il Treeview contiene solo le righe visibili
+        scrollbar = ttk.Scrollbar(video_frame, orient=tk.VERTICAL)
+        self.video_list = VirtualTreeview(self.video_tree, scrollbar, self._format_video_row)
         
         self.video_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
@@ -297,11 +354,22 @@ class YouTubeAnalyzerGUI:
                        value="fast", command=self.update_strategy_info).pack(side=tk.LEFT)
         ttk.Radiobutton(strategy_frame, text="Completo", variable=self.load_strategy, 
                        value="complete", command=self.update_strategy_info).pack(side=tk.LEFT)
+        ttk.Radiobutton(strategy_frame, text="Nuovi", variable=self.load_strategy, 
+                       value="incremental", command=self.update_strategy_info).pack(side=tk.LEFT)
+        
+        # Budget in unità di quota per il caricamento (vuoto = nessun limite)
+        ttk.Label(strategy_frame, text="Budget:").pack(side=tk.LEFT, padx=(10, 2))
+        self.quota_budget_var = tk.StringVar()
+        ttk.Entry(strategy_frame, textvariable=self.quota_budget_var, width=7).pack(side=tk.LEFT)
         
         self.get_videos_btn = ttk.Button(control_frame, text="Carica Video", 
                                         command=self.load_all_videos, state=tk.DISABLED)
         self.get_videos_btn.pack(side=tk.LEFT, padx=5)
         
+        self.refresh_stats_btn = ttk.Button(control_frame, text="Aggiorna Statistiche", 
+                                           command=self.refresh_statistics, state=tk.DISABLED)
+        self.refresh_stats_btn.pack(side=tk.LEFT, padx=5)
+        
         self.export_btn = ttk.Button(control_frame, text="Esporta CSV", 
                                     command=self.export_csv, state=tk.DISABLED)
         self.export_btn.pack(side=tk.LEFT, padx=5)
@@ -345,7 +413,8 @@ class YouTubeAnalyzerGUI:
         info = {
             "smart": "Ottimizzata: ~80% video, ~200 API calls per 20k+ video",
             "fast": "Veloce: max 3000 video recenti, ~60 API calls",
-            "complete": "⚠️ Completa: TUTTI i video, 500+ API calls per 20k+ video"
+            "complete": "⚠️ Completa: TUTTI i video, 500+ API calls per 20k+ video",
+            "incremental": "Nuovi: solo i video pubblicati dopo la sessione caricata, poche API calls"
         }
         self.update_status(f"Strategia: {info.get(strategy, '')}")
     
@@ -474,22 +543,6 @@ class YouTubeAnalyzerGUI:
                 status = "Nessuna API Key configurata"
             self.api_status_label.config(text=status)
     
-    def rotate_api_key(self):
-        """Ruota alla prossima API key disponibile"""
-        if len(self.api_keys) <= 1:
-            return False
-        
-        self.current_api_key_index = (self.current_api_key_index + 1) % len(self.api_keys)
-        new_key = self.api_keys[self.current_api_key_index]
-        self.api_key.set(new_key)
-        self.youtube = None  # Reset servizio per usare nuova key
-        
-        logging.info(f"Rotazione API Key: passato a Key {self.current_api_key_index + 1}")
-        self.update_api_status()
-        self.update_status(f"Cambiata API Key: usando Key {self.current_api_key_index + 1}")
-        
-        return True
-    
     def save_session(self):
         """Salva lo stato corrente della sessione"""
         if not self.channel_data:
@@ -504,23 +557,10 @@ class YouTubeAnalyzerGUI:
         
         if filename:
             try:
-                session_data = {
-                    'channel_url': self.channel_url.get(),
-                    'channel_data': self.channel_data,
-                    'videos': self.videos,
-                    'video_cache': self._video_cache,
-                    'search_cache': dict(self._search_cache),
-                    'api_calls_count': self.api_calls_count,
-                    'debug_info': self.debug_info,
-                    'timestamp': datetime.now().isoformat()
-                }
-                
-                with open(filename, 'wb') as f:
-                    pickle.dump(session_data, f)
+                self.loader.save_session(filename, self.channel_url.get())
                 
                 self.session_file = filename
                 messagebox.showinfo("Successo", f"Sessione salvata!\n{len(self.videos)} video salvati")
-                logging.info(f"Sessione salvata: {filename}")
                 
             except Exception as e:
                 messagebox.showerror("Errore", f"Errore nel salvataggio: {str(e)}")
@@ -529,56 +569,120 @@ class YouTubeAnalyzerGUI:
     def load_session(self):
         """Carica una sessione salvata"""
         filename = filedialog.askopenfilename(
-            filetypes=[("Session files", "*.session"), ("All files", "*.*")]
+            filetypes=[("Session files", "*.session"), ("Journal video", "*.records.jsonl"),
+                       ("All files", "*.*")]
         )
         
-        if filename:
+        if not filename:
+            return
+        if filename.endswith('.jsonl'):
+            # Journal di un caricamento non salvato: si compatta in una sessione accanto
+            journal = filename
+            filename = re.sub(r'(\.records)?\.jsonl$', '.session', journal)
+            if os.path.exists(filename) and not messagebox.askyesno("Sessione Esistente",
+                f"{os.path.basename(filename)} esiste già.\n\n"
+                "Sovrascriverla con i video del journal?"):
+                return
+            self.update_status(f"Compattazione journal {os.path.basename(journal)}...")
+            self.show_progress(True)
+            
+            thread = threading.Thread(target=self._compact_journal_thread, args=(journal, filename))
+            thread.daemon = True
+            thread.start()
+        else:
+            self._open_session(filename)
+    
+    def _compact_journal_thread(self, journal, filename):
+        """Thread per la compattazione di un journal dei video in una sessione"""
+        try:
+            count = compact_journal(journal, filename)
+            self.update_status(f"Journal compattato: {count:,} video in {os.path.basename(filename)}")
+            self.root.after(0, lambda: self._open_session(filename))
+        except Exception as e:
+            message = f"Errore nella compattazione del journal: {str(e)}"
+            self.update_status(f"Errore: {str(e)}")
+            logging.error(f"Errore compattazione journal: {e}")
+            self.root.after(0, lambda: messagebox.showerror("Errore", message))
+        finally:
+            self.show_progress(False)
+    
+    def _open_session(self, filename):
+        """Apre una sessione: metadati subito, video decodificati in background"""
+        try:
             try:
-                with open(filename, 'rb') as f:
-                    session_data = pickle.load(f)
-                
-                # Ripristina stato
-                self.channel_url.set(session_data['channel_url'])
-                self.channel_data = session_data['channel_data']
-                self.videos = session_data['videos']
-                self._video_cache = session_data['video_cache']
-                self._search_cache = defaultdict(set, session_data['search_cache'])
-                self.api_calls_count = session_data.get('api_calls_count', 0)
-                self.debug_info = session_data.get('debug_info', self.debug_info)
-                
-                self.session_file = filename
-                
-                # Aggiorna UI
-                self.display_channel_info()
-                self.display_videos(self.videos)
-                self.filtered_videos = self.videos.copy()
-                
-                # Abilita pulsanti
-                self.get_videos_btn.config(state=tk.NORMAL)
-                self.export_btn.config(state=tk.NORMAL)
-                
-                saved_date = session_data.get('timestamp', 'N/A')
-                total_videos = int(self.channel_data['statistics'].get('videoCount', 0))
-                completeness = (len(self.videos) / total_videos * 100) if total_videos > 0 else 0
-                
-                messagebox.showinfo("Successo", 
-                    f"Sessione caricata!\n"
-                    f"Video: {len(self.videos):,} ({completeness:.1f}%)\n"
-                    f"Salvata il: {saved_date[:19]}")
-                
-                self.update_status(f"Sessione caricata: {len(self.videos):,} video")
-                logging.info(f"Sessione caricata: {filename}")
-                
-                # Chiedi se continuare caricamento
-                if completeness < 95:
-                    if messagebox.askyesno("Continua Caricamento?", 
-                        f"La sessione contiene solo il {completeness:.1f}% dei video.\n"
-                        f"Vuoi continuare il caricamento da dove era stato interrotto?"):
-                        self.load_all_videos()
-                
-            except Exception as e:
-                messagebox.showerror("Errore", f"Errore nel caricamento: {str(e)}")
-                logging.error(f"Errore caricamento sessione: {e}")
+                reader = self.loader.open_session(filename)
+            except LegacySessionError:
+                # Il vecchio formato pickle può eseguire codice arbitrario
+                if not messagebox.askyesno("Sessione Vecchio Formato", 
+                    "Questa sessione usa il vecchio formato (pickle).\n"
+                    "Aprila solo se proviene da una fonte affidabile.\n\n"
+                    "Importarla? Al prossimo salvataggio verrà convertita nel nuovo formato."):
+                    return
+                session_meta = self.loader.load_legacy_session(filename)
+                self._on_session_loaded(filename, session_meta)
+                return
+            
+            # Metadati subito disponibili: i video vengono decodificati in background
+            self.channel_url.set(reader.meta['channel_url'])
+            self.display_channel_info()
+            self.update_status(f"Lettura sessione: {reader.count:,} video...")
+            self.show_progress(True)
+            
+            thread = threading.Thread(target=self._read_session_thread, args=(filename, reader))
+            thread.daemon = True
+            thread.start()
+            
+        except Exception as e:
+            messagebox.showerror("Errore", f"Errore nel caricamento: {str(e)}")
+            logging.error(f"Errore caricamento sessione: {e}")
+    
+    def _read_session_thread(self, filename, reader):
+        """Thread per la decodifica delle colonne della sessione"""
+        try:
+            self.loader.read_session_videos(reader)
+            self.root.after(0, lambda: self._on_session_loaded(filename, reader.meta))
+        except Exception as e:
+            message = f"Errore nel caricamento: {str(e)}"  # 'e' non esiste più quando gira la callback
+            self.update_status(f"Errore: {str(e)}")
+            logging.error(f"Errore caricamento sessione: {e}")
+            self.root.after(0, lambda: messagebox.showerror("Errore", message))
+        finally:
+            self.show_progress(False)
+    
+    def _on_session_loaded(self, filename, session_meta):
+        """Aggiorna la UI dopo il caricamento completo di una sessione"""
+        # Ripristina stato
+        self.channel_url.set(session_meta['channel_url'])
+        
+        self.session_file = filename
+        
+        # Aggiorna UI
+        self.display_channel_info()
+        self.display_videos()
+        self.filtered_videos = self.videos.copy()
+        
+        # Abilita pulsanti
+        self.get_videos_btn.config(state=tk.NORMAL)
+        self.refresh_stats_btn.config(state=tk.NORMAL)
+        self.export_btn.config(state=tk.NORMAL)
+        
+        saved_date = session_meta.get('timestamp', 'N/A')
+        total_videos = int(self.channel_data['statistics'].get('videoCount', 0))
+        completeness = (len(self.videos) / total_videos * 100) if total_videos > 0 else 0
+        
+        messagebox.showinfo("Successo", 
+            f"Sessione caricata!\n"
+            f"Video: {len(self.videos):,} ({completeness:.1f}%)\n"
+            f"Salvata il: {saved_date[:19]}")
+        
+        self.update_status(f"Sessione caricata: {len(self.videos):,} video")
+        
+        # Chiedi se continuare caricamento
+        if completeness < 95:
+            if messagebox.askyesno("Continua Caricamento?", 
+                f"La sessione contiene solo il {completeness:.1f}% dei video.\n"
+                f"Vuoi continuare il caricamento da dove era stato interrotto?"):
+                self.load_all_videos()
     
     def show_debug_info(self):
         """Mostra informazioni di debug"""
@@ -600,6 +704,7 @@ class YouTubeAnalyzerGUI:
         # Prepara debug info
         total_videos = int(self.channel_data['statistics'].get('videoCount', 0)) if self.channel_data else 'N/A'
         total_videos_str = f"{total_videos:,}" if isinstance(total_videos, int) else total_videos
+        quota = self.loader.quota
         
         info = f"""=== DEBUG INFORMATION ===
 Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -608,26 +713,38 @@ CHANNEL INFO:
 - URL: {self.channel_url.get()}
 - Video totali dichiarati: {total_videos_str}
 - Video caricati: {len(self.videos):,}
-- Video in cache: {len(self._video_cache):,}
+- Video in cache: {len(self.loader._video_cache):,}
+- Video in cache persistente: {len(self.loader.video_cache) if self.loader.video_cache is not None else 'disattivata'}
+- Hit cache persistente: {self.loader.persistent_cache_hits:,}
+- Pagine search dalla cache: {self.loader.search_cache_hits:,}
+- Risposte 304 (ETag invariato): {self.loader.etag_cache.hits:,} ({self.loader.etag_cache.parse_skipped:,} senza decodifica JSON)
 
 API CALLS:
-- Totale chiamate API: {self.api_calls_count}
+- Totale chiamate API: {self.loader.api_calls_count}
 - API Keys disponibili: {len(self.api_keys)}
 - Key attuale: {self.current_api_key_index + 1} di {len(self.api_keys)}
 
+QUOTA (giornata corrente):
+- Unità usate oggi: {quota.used_today():,} (restanti stimate: {quota.remaining(self.api_keys):,})
+- Azzeramento quota: {quota.reset_at.astimezone():%Y-%m-%d %H:%M}
+{chr(10).join(f"- {endpoint}: {units:,} unità in {quota.calls_by_endpoint[endpoint]:,} chiamate" for endpoint, units in sorted(quota.units_by_endpoint.items()))}
+{chr(10).join(f"- Key {i + 1}: {quota.used_today(key):,} unità" + (" (in pausa fino all'azzeramento)" if quota.is_exhausted(key) else "") for i, key in enumerate(self.api_keys))}
+
 CARICAMENTO DETTAGLI:
-- Pagine playlist caricate: {self.debug_info['playlist_pages']}
-- Pagine search caricate: {self.debug_info['search_pages']}
-- Errori quota: {self.debug_info['quota_errors']}
-- Altri errori: {self.debug_info['other_errors']}
-- Ultimo errore: {self.debug_info['last_error']}
+- Pagine playlist caricate: {self.loader.debug_info['playlist_pages']}
+- Pagine search caricate: {self.loader.debug_info['search_pages']}
+- Errori quota: {self.loader.debug_info['quota_errors']}
+- Errori di sovraccarico (rate limit, 5xx): {self.loader.debug_info['overload_errors']}
+- Altri errori: {self.loader.debug_info['other_errors']}
+- Finestra di concorrenza: {self.loader.limiter.limit:.1f} (segnali di sovraccarico: {self.loader.limiter.overloads}, ritentativi: {self.loader.limiter.retries})
+- Ultimo errore: {self.loader.debug_info['last_error']}
 
 STRATEGIE USATE:
-{chr(10).join(f"- {s}" for s in self.debug_info['strategies_used'])}
+{chr(10).join(f"- {s}" for s in self.loader.debug_info['strategies_used'])}
 
 VIDEO IDs UNICI TROVATI:
-- Totale: {len(set(v['video_id'] for v in self.videos))}
-- Duplicati rimossi: {len(self.videos) - len(set(v['video_id'] for v in self.videos))}
+- Totale: {len(set(v.video_id for v in self.videos))}
+- Duplicati rimossi: {len(self.videos) - len(set(v.video_id for v in self.videos))}
 
 ANALISI TEMPORALE:
 """
@@ -636,7 +753,7 @@ ANALISI TEMPORALE:
             # Analisi per anno
             year_counts = defaultdict(int)
             for video in self.videos:
-                year = video['data_pubblicazione'][:4]
+                year = video.published_at[:4]
                 year_counts[year] += 1
             
             info += "\nVideo per anno:\n"
@@ -674,29 +791,6 @@ ANALISI TEMPORALE:
         ttk.Button(button_frame, text="Salva Debug Info", command=save_debug).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Chiudi", command=dialog.destroy).pack(side=tk.RIGHT, padx=5)
     
-    def get_youtube_service(self):
-        """Ottiene o crea l'istanza del servizio YouTube con caching"""
-        if not self.youtube:
-            current_key = self.api_key.get()
-            if not current_key and self.api_keys:
-                current_key = self.api_keys[self.current_api_key_index]
-                self.api_key.set(current_key)
-            
-            self.youtube = build('youtube', 'v3', developerKey=current_key)
-            logging.info(f"YouTube service creato con Key {self.current_api_key_index + 1}")
-        return self.youtube
-    
-    def rate_limit(self):
-        """Implementa rate limiting per le API calls"""
-        # Modalità aggressiva per strategia Complete
-        delay = 0.05 if self.aggressive_mode else self.api_call_delay
-        
-        current_time = time.time()
-        time_since_last_call = current_time - self.last_api_call
-        if time_since_last_call < delay:
-            time.sleep(delay - time_since_last_call)
-        self.last_api_call = time.time()
-    
     def analyze_channel(self):
         """Analizza il canale in un thread separato"""
         if not self.api_key.get():
@@ -707,10 +801,6 @@ ANALISI TEMPORALE:
             messagebox.showerror("Errore", "Inserisci l'URL del canale!")
             return
         
-        # Reset cache quando si analizza un nuovo canale
-        self._video_cache.clear()
-        self._search_cache.clear()
-        
         # Avvia analisi in thread
         thread = threading.Thread(target=self._analyze_channel_thread)
         thread.daemon = True
@@ -720,35 +810,17 @@ ANALISI TEMPORALE:
         """Thread per l'analisi del canale"""
         self.update_status("Analisi del canale in corso...")
         self.show_progress(True)
-        self.api_calls_count = 0
         
         try:
-            youtube = self.get_youtube_service()
-            
-            # Estrai channel ID
-            channel_id = self.extract_channel_id(youtube, self.channel_url.get())
-            if not channel_id:
-                self.update_status("Errore: Canale non trovato")
-                self.show_progress(False)
-                return
-            
-            # Ottieni info canale
-            self.rate_limit()
-            response = youtube.channels().list(
-                part='snippet,statistics,contentDetails',
-                id=channel_id
-            ).execute()
-            self.api_calls_count += 1
-            
-            if response['items']:
-                self.channel_data = response['items'][0]
+            self._sync_loader_keys()
+            if self.loader.analyze_channel(self.channel_url.get()):
                 self.display_channel_info()
-                self.update_status(f"Analisi completata! (API calls: {self.api_calls_count})")
+                self.update_status(f"Analisi completata! (API calls: {self.loader.api_calls_count})")
                 
                 # Abilita pulsanti
                 self.root.after(0, lambda: self.get_videos_btn.config(state=tk.NORMAL))
             else:
-                self.update_status("Canale non trovato")
+                self.update_status("Errore: Canale non trovato")
                 
         except Exception as e:
             self.update_status(f"Errore: {str(e)}")
@@ -756,62 +828,6 @@ ANALISI TEMPORALE:
         finally:
             self.show_progress(False)
     
-    def extract_channel_id(self, youtube, channel_url):
-        """Estrae l'ID del canale dall'URL in modo efficiente"""
-        # Patterns per diversi tipi di URL YouTube
-        patterns = [
-            (r'youtube\.com/channel/([a-zA-Z0-9_-]+)', 'direct'),
-            (r'youtube\.com/c/([a-zA-Z0-9_-]+)', 'custom'),
-            (r'youtube\.com/@([a-zA-Z0-9_.-]+)', 'handle'),
-            (r'youtube\.com/user/([a-zA-Z0-9_-]+)', 'user'),
-            (r'youtube\.com/([a-zA-Z0-9_-]+)$', 'simple')
-        ]
-        
-        for pattern, type_match in patterns:
-            match = re.search(pattern, channel_url)
-            if match:
-                identifier = match.group(1)
-                
-                if type_match == 'direct':
-                    return identifier
-                
-                # Per handle, prova prima il metodo più efficiente
-                if type_match == 'handle':
-                    try:
-                        self.rate_limit()
-                        response = youtube.channels().list(
-                            part='id',
-                            forHandle=identifier,
-                            maxResults=1
-                        ).execute()
-                        self.api_calls_count += 1
-                        
-                        if response['items']:
-                            return response['items'][0]['id']
-                    except Exception as e:
-                        logging.error(f"Errore nella ricerca handle: {e}")
-                        pass
-                
-                # Usa search come fallback
-                try:
-                    self.rate_limit()
-                    response = youtube.search().list(
-                        part='snippet',
-                        q=identifier,
-                        type='channel',
-                        maxResults=1
-                    ).execute()
-                    self.api_calls_count += 1
-                    
-                    if response['items']:
-                        return response['items'][0]['snippet']['channelId']
-                        
-                except Exception as e:
-                    logging.error(f"Errore nella ricerca del canale: {e}")
-                    continue
-        
-        return None
-    
     def display_channel_info(self):
         """Mostra le informazioni del canale"""
         if not self.channel_data:
@@ -837,6 +853,14 @@ Data creazione: {snippet['publishedAt'][:10]}
         self.info_text.insert(1.0, info)
         self.info_text.config(state=tk.DISABLED)
     
+    def _parse_quota_budget(self):
+        """Budget di quota inserito dall'utente (None se vuoto o non valido)"""
+        budget_str = self.quota_budget_var.get().strip().replace('.', '').replace(',', '')
+        try:
+            return int(budget_str) if budget_str else None
+        except ValueError:
+            return None
+    
     def load_all_videos(self):
         """Carica i video del canale"""
         if not self.channel_data:
@@ -850,59 +874,44 @@ Data creazione: {snippet['publishedAt'][:10]}
         """Thread ottimizzato per caricare i video"""
         self.update_status("Caricamento video in corso...")
         self.show_progress(True)
-        self.videos = []
-        start_api_calls = self.api_calls_count
         
         try:
-            youtube = self.get_youtube_service()
+            self._sync_loader_keys()
             strategy = self.load_strategy.get()
+            self.loader.quota_budget = self._parse_quota_budget()
             total_video_count = int(self.channel_data['statistics'].get('videoCount', 0))
             
-            # Avviso per canali molto grandi
-            if total_video_count > 10000:
-                self.update_status(f"⚠️ Canale con {total_video_count:,} video rilevato...")
-                if strategy == "complete":
-                    self.update_status("🚨 Strategia Complete per canale grande: potrebbe richiedere 30+ minuti!")
-                    
-                # Avviso speciale per canali enormi
-                if total_video_count > 100000:
-                    response = messagebox.askyesno("Canale Molto Grande", 
-                        f"Questo canale ha {total_video_count:,} video!\n\n"
-                        f"⚠️ LIMITAZIONI YOUTUBE API:\n"
-                        f"• La Playlist API può recuperare max ~20,000 video\n"
-                        f"• La Search API ha limiti non documentati (~500 pagine)\n"
-                        f"• Alcuni video potrebbero essere privati/non listati\n\n"
-                        f"Per canali TV/broadcast come questo:\n"
-                        f"• Aspettati di recuperare 10-30% dei video totali\n"
-                        f"• Molti video potrebbero essere clip brevi o non indicizzate\n"
-                        f"• Considera di filtrare per periodo specifico\n\n"
-                        f"Continuo comunque?")
-                    
-                    if not response:
-                        self.update_status("Caricamento annullato dall'utente")
-                        self.show_progress(False)
-                        return
-            
-            if strategy == "fast":
-                self._load_videos_fast(youtube)
-            elif strategy == "complete":
-                self._load_videos_complete(youtube, total_video_count)
-            else:  # smart
-                self._load_videos_smart(youtube, total_video_count)
-            
-            # Ordina i video per data (più recenti prima)
-            self.videos.sort(key=lambda x: x['data_pubblicazione'], reverse=True)
+            # Avviso speciale per canali enormi
+            if total_video_count > 100000:
+                response = messagebox.askyesno("Canale Molto Grande", 
+                    f"Questo canale ha {total_video_count:,} video!\n\n"
+                    f"⚠️ LIMITAZIONI YOUTUBE API:\n"
+                    f"• La Playlist API può recuperare max ~20,000 video\n"
+                    f"• La Search API ha limiti non documentati (~500 pagine)\n"
+                    f"• Alcuni video potrebbero essere privati/non listati\n\n"
+                    f"Per canali TV/broadcast come questo:\n"
+                    f"• Aspettati di recuperare 10-30% dei video totali\n"
+                    f"• Molti video potrebbero essere clip brevi o non indicizzate\n"
+                    f"• Considera di filtrare per periodo specifico\n\n"
+                    f"Continuo comunque?")
+                
+                if not response:
+                    self.update_status("Caricamento annullato dall'utente")
+                    self.show_progress(False)
+                    return
+        
+            summary = self.loader.load_videos(strategy)
+            self._title_positions = None  # La lista viene riordinata sul posto
             
             # Mostra video
-            self.display_videos(self.videos)
+            self.root.after(0, self.display_videos)
             self.filtered_videos = self.videos.copy()
             
-            # Analizza video mancanti
-            missing_analysis = self._analyze_missing_videos()
-            
-            api_used = self.api_calls_count - start_api_calls
-            completeness = (len(self.videos) / total_video_count * 100) if total_video_count > 0 else 100
-            status_msg = f"Caricati {len(self.videos):,} video ({completeness:.1f}% del totale) - API calls: {api_used}"
+            missing_analysis = summary['missing_analysis']
+            api_used = summary['api_used']
+            completeness = summary['completeness']
+            status_msg = (f"Caricati {len(self.videos):,} video ({completeness:.1f}% del totale) - "
+                          f"API calls: {api_used} ({summary['quota_used']:,} unità)")
             
             # Aggiungi info sulla strategia usata e video mancanti
             if strategy == "complete" and completeness < 95:
@@ -924,11 +933,15 @@ Data creazione: {snippet['publishedAt'][:10]}
                         
             elif strategy == "smart" and completeness < 80:
                 status_msg += " | 💡 Usa strategia 'Complete' per più video"
+            
+            if summary['checkpoint']:
+                status_msg += " | 💾 Interrotto: ricarica per riprendere dal checkpoint"
                 
             self.update_status(status_msg)
             
             # Abilita pulsanti
             self.root.after(0, lambda: self.export_btn.config(state=tk.NORMAL))
+            self.root.after(0, lambda: self.refresh_stats_btn.config(state=tk.NORMAL))
             
         except Exception as e:
             self.update_status(f"Errore: {str(e)}")
@@ -936,597 +949,39 @@ Data creazione: {snippet['publishedAt'][:10]}
         finally:
             self.show_progress(False)
     
-    def _analyze_missing_videos(self):
-        """Analizza perché alcuni video non vengono trovati"""
-        if not self.channel_data:
-            return None
-            
-        total_declared = int(self.channel_data['statistics'].get('videoCount', 0))
-        total_found = len(self.videos)
-        missing = total_declared - total_found
-        
-        if missing > 0:
-            logging.warning(f"Video mancanti: {missing:,} ({missing/total_declared*100:.1f}%)")
-            
-            # Analizza distribuzione temporale
-            if self.videos:
-                oldest_date = min(v['data_pubblicazione'] for v in self.videos)
-                newest_date = max(v['data_pubblicazione'] for v in self.videos)
-                
-                # Conta video per anno
-                year_counts = defaultdict(int)
-                for v in self.videos:
-                    year = int(v['data_pubblicazione'][:4])
-                    year_counts[year] += 1
-                
-                # Trova anni con pochi video (possibili gap)
-                avg_per_year = total_found / len(year_counts) if year_counts else 0
-                gaps = []
-                for year in range(min(year_counts.keys()), max(year_counts.keys()) + 1):
-                    if year_counts[year] < avg_per_year * 0.5:
-                        gaps.append((year, year_counts[year]))
-                
-                logging.info(f"Range video trovati: {oldest_date[:10]} - {newest_date[:10]}")
-                logging.info(f"Anni con pochi video (possibili gap): {gaps}")
-                
-                # Possibili cause
-                causes = []
-                if int(oldest_date[:4]) > 2010:
-                    causes.append("Video più vecchi del 2010 potrebbero non essere indicizzati")
-                if missing > total_found * 0.5:
-                    causes.append("Possibili video privati/eliminati/non listati")
-                if self.debug_info['quota_errors'] > 0:
-                    causes.append(f"Quota API esaurita {self.debug_info['quota_errors']} volte")
-                if total_declared > 50000:
-                    causes.append("YouTube API limita i risultati per canali molto grandi")
-                if 'La7' in self.channel_data['snippet']['title'] or total_declared > 100000:
-                    causes.append("Canali broadcast TV hanno spesso metadati non standard")
-                    
-                # Controlla se ci sono limiti API specifici
-                if len(self.videos) > 0:
-                    # YouTube Search API ha un limite non documentato di ~500-1000 pagine
-                    if self.debug_info['search_pages'] > 400:
-                        causes.append("Raggiunto limite pagine Search API (~500 pagine)")
-                    if self.debug_info['playlist_pages'] > 400:
-                        causes.append("Raggiunto limite pagine Playlist API")
-                    
-                logging.info(f"Possibili cause video mancanti: {', '.join(causes)}")
-                
-                return {
-                    'missing': missing,
-                    'percentage': missing/total_declared*100,
-                    'date_range': (oldest_date[:10], newest_date[:10]),
-                    'gaps': gaps,
-                    'causes': causes
-                }
-        return None
-    
-    def _load_videos_smart(self, youtube, total_count):
-        """Strategia smart: bilancia completezza e efficienza"""
-        if total_count <= 500:
-            # Per canali piccoli usa playlist API
-            self._load_from_playlist(youtube, max_pages=20)
-        elif total_count <= 3000:
-            # Per canali medi usa combinazione
-            self._load_from_playlist(youtube, max_pages=60)
-            if len(self.videos) < total_count * 0.8:
-                self._load_from_search(youtube, max_results=1000)
-        else:
-            # Per canali grandi usa strategia mista ottimizzata
-            self.update_status(f"📊 Canale grande ({total_count:,} video). Caricamento ottimizzato...")
-            
-            # Fase 1: Playlist per video recenti
-            self._load_from_playlist(youtube, max_pages=200)  # Aumentato da 100
-            
-            # Fase 2: Search ottimizzata
-            if len(self.videos) < total_count * 0.7:
-                self._load_from_search_optimized(youtube, total_count)
-    
-    def _load_videos_fast(self, youtube):
-        """Strategia veloce: carica solo i video più recenti"""
-        self._load_from_playlist(youtube, max_pages=60)
-    
-    def _load_videos_complete(self, youtube, total_count):
-        """Strategia completa: prova a caricare tutti i video"""
-        # Attiva modalità aggressiva per velocizzare
-        self.aggressive_mode = True
-        
-        try:
-            # Prima usa playlist API al massimo
-            self.update_status("📥 Fase 1: Caricamento via Playlist API...")
-            self._load_from_playlist(youtube, max_pages=500)  # Nessun limite pratico
-            
-            # Poi usa search comprehensiva
-            if len(self.videos) < total_count * 0.95:
-                self.update_status(f"🔍 Fase 2: Ricerca completa ({len(self.videos):,}/{total_count:,} video)...")
-                self._load_from_search_comprehensive(youtube, total_count)
-        finally:
-            # Disattiva modalità aggressiva
-            self.aggressive_mode = False
-    
-    def _load_from_playlist(self, youtube, max_pages=None):
-        """Carica video dalla playlist uploads con gestione quota"""
-        playlist_id = self.channel_data['contentDetails']['relatedPlaylists']['uploads']
-        
-        # Se abbiamo già una sessione, riprendi da dove eravamo
-        if self.session_state and isinstance(self.session_state, dict) and 'playlist_token' in self.session_state:
-            next_page_token = self.session_state['playlist_token']
-            page_count = self.session_state.get('playlist_pages', 0)
-            logging.info(f"Ripresa playlist da pagina {page_count} con token: {next_page_token[:20] if next_page_token else 'None'}...")
-        else:
-            next_page_token = None
-            page_count = 0
-        
-        while True:
-            if max_pages and page_count >= max_pages:
-                break
-                
-            try:
-                self.rate_limit()
-                response = youtube.playlistItems().list(
-                    part='contentDetails',
-                    playlistId=playlist_id,
-                    maxResults=50,
-                    pageToken=next_page_token
-                ).execute()
-                self.api_calls_count += 1
-                page_count += 1
-                self.debug_info['playlist_pages'] += 1
-                
-                video_ids = [item['contentDetails']['videoId'] for item in response['items']]
-                
-                if video_ids:
-                    self._load_video_details_batch(youtube, video_ids)
-                
-                self.update_status(f"Playlist: {len(self.videos)} video caricati (pagina {page_count})...")
-                
-                # Salva stato per ripresa
-                self.session_state = {
-                    'playlist_token': response.get('nextPageToken'),
-                    'playlist_pages': page_count
-                }
-                
-                next_page_token = response.get('nextPageToken')
-                if not next_page_token:
-                    logging.info(f"Playlist completata dopo {page_count} pagine")
-                    break
-                    
-                # Rate limiting adattivo
-                if page_count % 10 == 0:
-                    time.sleep(0.5)
-                    
-            except HttpError as e:
-                self.debug_info['last_error'] = str(e)
-                if e.resp.status == 403:
-                    self.debug_info['quota_errors'] += 1
-                    logging.error(f"Quota esaurita su playlist (pagina {page_count})")
-                    
-                    # Prova a ruotare API key
-                    if self.rotate_api_key():
-                        youtube = self.get_youtube_service()
-                        self.update_status("Quota esaurita, cambio API key...")
-                        time.sleep(2)  # Pausa prima di riprovare
-                        continue
-                    else:
-                        self.update_status("⚠️ Quota API esaurita su tutte le keys!")
-                        break
-                else:
-                    self.debug_info['other_errors'] += 1
-                    logging.error(f"Errore playlist: {e}")
-                    raise e
-    
-    def _load_from_search(self, youtube, max_results=2000):
-        """Carica video usando search API standard"""
-        channel_id = self._get_channel_id()
-        if not channel_id:
-            return
-            
-        next_page_token = None
-        results_count = 0
-        existing_ids = {v['video_id'] for v in self.videos}
-        
-        while results_count < max_results:
-            try:
-                self.rate_limit()
-                response = youtube.search().list(
-                    part='id',
-                    channelId=channel_id,
-                    type='video',
-                    maxResults=50,
-                    pageToken=next_page_token,
-                    order='date'
-                ).execute()
-                self.api_calls_count += 1
-                
-                new_video_ids = []
-                for item in response['items']:
-                    video_id = item['id']['videoId']
-                    if video_id not in existing_ids:
-                        new_video_ids.append(video_id)
-                        existing_ids.add(video_id)
-                
-                if new_video_ids:
-                    self._load_video_details_batch(youtube, new_video_ids)
-                    results_count += len(new_video_ids)
-                
-                self.update_status(f"Search: {len(self.videos)} video totali...")
-                
-                next_page_token = response.get('nextPageToken')
-                if not next_page_token or len(new_video_ids) == 0:
-                    break
-                    
-            except HttpError as e:
-                if e.resp.status == 403:
-                    break
-                else:
-                    print(f"Errore search: {e}")
-                    break
-    
-    def _load_from_search_optimized(self, youtube, total_count):
-        """Strategia di ricerca ottimizzata per canali grandi"""
-        channel_id = self._get_channel_id()
-        if not channel_id:
-            return
-            
-        existing_ids = {v['video_id'] for v in self.videos}
-        
-        # Strategia 1: Ricerca per periodi recenti (ultimi 10 anni)
-        current_year = datetime.now().year
-        for year in range(current_year, max(2010, current_year - 10), -1):
-            if len(self.videos) > min(total_count * 0.9, 50000):  # Aumentato limite
-                break
-                
-            self._search_by_year(youtube, channel_id, year, existing_ids, max_pages=30)
-        
-        # Strategia 2: Diversi ordinamenti per trovare video mancanti
-        for order in ['viewCount', 'relevance', 'rating']:
-            if len(self.videos) > min(total_count * 0.95, 60000):  # Aumentato limite
-                break
-                
-            self._search_by_order(youtube, channel_id, order, existing_ids, max_pages=20)
-    
-    def _load_from_search_comprehensive(self, youtube, total_count):
-        """Ricerca completa per canali che vogliono tutti i video"""
-        channel_id = self._get_channel_id()
-        if not channel_id:
-            logging.error("Channel ID non trovato per ricerca comprehensiva")
+    def refresh_statistics(self):
+        """Aggiorna solo views/like/commenti dei video già caricati"""
+        if not self.videos:
             return
-            
-        existing_ids = {v['video_id'] for v in self.videos}
-        initial_count = len(self.videos)
-        
-        # NESSUN LIMITE - Continua fino a trovare tutti i video
-        self.update_status("⚠️ Modalità Complete: potrebbe richiedere molto tempo e molte API calls...")
-        logging.info(f"Inizio ricerca comprehensiva. Video esistenti: {initial_count}")
-        
-        # Cerca per tutti gli anni
-        current_year = datetime.now().year
-        for year in range(2005, current_year + 1):
-            if self.debug_info['quota_errors'] > 5:
-                logging.warning("Troppe quote errors, interrompo ricerca")
-                break
-                
-            videos_before = len(self.videos)
-            self._search_by_year(youtube, channel_id, year, existing_ids, max_pages=100)
-            videos_after = len(self.videos)
-            
-            if videos_after - videos_before > 0:
-                logging.info(f"Anno {year}: trovati {videos_after - videos_before} nuovi video")
-        
-        # Cerca con tutti gli ordinamenti per trovare video mancanti
-        orders = ['date', 'viewCount', 'relevance', 'rating', 'title']
-        for order in orders:
-            if self.debug_info['quota_errors'] > 10:
-                break
-                
-            old_count = len(self.videos)
-            self._search_by_order(youtube, channel_id, order, existing_ids, max_pages=100)
-            new_count = len(self.videos)
-            
-            if new_count - old_count > 0:
-                logging.info(f"Ordinamento {order}: trovati {new_count - old_count} nuovi video")
-            
-            # Se questo ordinamento ha trovato molti nuovi video, riprova
-            if new_count - old_count > 100:
-                self._search_by_order(youtube, channel_id, order, existing_ids, max_pages=100)
-        
-        # Ricerca aggiuntiva per mesi se mancano ancora video
-        current_ratio = len(self.videos) / total_count if total_count > 0 else 1
-        if current_ratio < 0.95:
-            self.update_status(f"🔍 Ricerca dettagliata per mesi ({len(self.videos):,}/{total_count:,} = {current_ratio*100:.1f}%)...")
-            
-            # Focus sugli ultimi 10 anni dove ci sono probabilmente più video
-            for year in range(max(2010, current_year - 15), current_year + 1):
-                if self.debug_info['quota_errors'] > 20:
-                    break
-                    
-                for month in range(1, 13):
-                    videos_before = len(self.videos)
-                    self._search_by_month(youtube, channel_id, year, month, existing_ids, max_pages=20)
-                    videos_after = len(self.videos)
-                    
-                    if videos_after - videos_before > 0:
-                        logging.info(f"Mese {year}-{month:02d}: trovati {videos_after - videos_before} nuovi video")
-        
-        final_count = len(self.videos)
-        logging.info(f"Ricerca comprehensiva completata. Video trovati: {final_count - initial_count} nuovi, totale: {final_count}")
-    
-    def _search_by_year(self, youtube, channel_id, year, existing_ids, max_pages=20):
-        """Cerca video di un anno specifico con gestione quota"""
-        next_page_token = None
-        page_count = 0
-        
-        published_after = f"{year}-01-01T00:00:00Z"
-        published_before = f"{year + 1}-01-01T00:00:00Z"
-        
-        self.debug_info['strategies_used'].append(f"Search per anno {year}")
-        
-        while page_count < max_pages:
-            try:
-                self.rate_limit()
-                response = youtube.search().list(
-                    part='id',
-                    channelId=channel_id,
-                    type='video',
-                    maxResults=50,
-                    pageToken=next_page_token,
-                    publishedAfter=published_after,
-                    publishedBefore=published_before,
-                    order='date'
-                ).execute()
-                self.api_calls_count += 1
-                page_count += 1
-                self.debug_info['search_pages'] += 1
-                
-                new_video_ids = []
-                for item in response['items']:
-                    video_id = item['id']['videoId']
-                    if video_id not in existing_ids:
-                        new_video_ids.append(video_id)
-                        existing_ids.add(video_id)
-                
-                if new_video_ids:
-                    self._load_video_details_batch(youtube, new_video_ids)
-                
-                if len(new_video_ids) > 0:
-                    self.update_status(f"Anno {year}: {len(self.videos)} video totali...")
-                
-                next_page_token = response.get('nextPageToken')
-                if not next_page_token or len(new_video_ids) < 10:
-                    break
-                    
-            except HttpError as e:
-                self.debug_info['last_error'] = str(e)
-                if e.resp.status == 403:
-                    self.debug_info['quota_errors'] += 1
-                    logging.error(f"Quota esaurita su search anno {year}")
-                    
-                    # Prova a ruotare API key
-                    if self.rotate_api_key():
-                        youtube = self.get_youtube_service()
-                        self.update_status(f"Quota esaurita per anno {year}, cambio API key...")
-                        time.sleep(2)
-                        continue
-                    else:
-                        logging.warning(f"Impossibile completare ricerca anno {year}")
-                        break
-                else:
-                    self.debug_info['other_errors'] += 1
-                    logging.error(f"Errore search anno {year}: {e}")
-                    break
-    
-    def _search_by_order(self, youtube, channel_id, order, existing_ids, max_pages=20):
-        """Cerca video con un ordinamento specifico"""
-        next_page_token = None
-        page_count = 0
-        consecutive_empty = 0
-        
-        while page_count < max_pages:
-            try:
-                self.rate_limit()
-                response = youtube.search().list(
-                    part='id',
-                    channelId=channel_id,
-                    type='video',
-                    maxResults=50,
-                    pageToken=next_page_token,
-                    order=order
-                ).execute()
-                self.api_calls_count += 1
-                page_count += 1
-                
-                new_video_ids = []
-                for item in response['items']:
-                    video_id = item['id']['videoId']
-                    if video_id not in existing_ids:
-                        new_video_ids.append(video_id)
-                        existing_ids.add(video_id)
-                
-                if new_video_ids:
-                    self._load_video_details_batch(youtube, new_video_ids)
-                    consecutive_empty = 0
-                else:
-                    consecutive_empty += 1
-                
-                if consecutive_empty > 3:  # Stop se non trova nuovi video
-                    break
-                
-                next_page_token = response.get('nextPageToken')
-                if not next_page_token:
-                    break
-                    
-            except HttpError:
-                break
-    
-    def _search_by_month(self, youtube, channel_id, year, month, existing_ids, max_pages=10):
-        """Cerca video di un mese specifico"""
-        next_page_token = None
-        page_count = 0
-        
-        # Calcola date range per il mese
-        if month == 12:
-            next_month = 1
-            next_year = year + 1
-        else:
-            next_month = month + 1
-            next_year = year
-            
-        published_after = f"{year}-{month:02d}-01T00:00:00Z"
-        published_before = f"{next_year}-{next_month:02d}-01T00:00:00Z"
         
-        while page_count < max_pages:
-            try:
-                self.rate_limit()
-                response = youtube.search().list(
-                    part='id',
-                    channelId=channel_id,
-                    type='video',
-                    maxResults=50,
-                    pageToken=next_page_token,
-                    publishedAfter=published_after,
-                    publishedBefore=published_before,
-                    order='date'
-                ).execute()
-                self.api_calls_count += 1
-                page_count += 1
-                
-                new_video_ids = []
-                for item in response['items']:
-                    video_id = item['id']['videoId']
-                    if video_id not in existing_ids:
-                        new_video_ids.append(video_id)
-                        existing_ids.add(video_id)
-                
-                if new_video_ids:
-                    self._load_video_details_batch(youtube, new_video_ids)
-                    
-                self.update_status(f"Mese {year}-{month:02d}: {len(self.videos)} video totali...")
-                
-                next_page_token = response.get('nextPageToken')
-                if not next_page_token or len(new_video_ids) < 5:
-                    break
-                    
-            except HttpError:
-                break
-    
-    def _get_channel_id(self):
-        """Ottiene l'ID del canale dal channel data"""
-        # Prova prima dal channel data stesso
-        if 'id' in self.channel_data:
-            return self.channel_data['id']
-            
-        # Altrimenti estrai dalla playlist uploads
-        playlist_id = self.channel_data['contentDetails']['relatedPlaylists']['uploads']
-        if playlist_id.startswith('UU'):
-            return 'UC' + playlist_id[2:]
-            
-        return None
+        thread = threading.Thread(target=self._refresh_statistics_thread)
+        thread.daemon = True
+        thread.start()
     
-    def _load_video_details_batch(self, youtube, video_ids):
-        """Carica dettagli video in batch con caching e gestione quota"""
-        new_video_ids = [vid for vid in video_ids if vid not in self._video_cache]
-        
-        if not new_video_ids:
-            # Tutti i video sono già in cache
-            for vid in video_ids:
-                if vid in self._video_cache:
-                    self.videos.append(self._video_cache[vid])
-            return
+    def _refresh_statistics_thread(self):
+        """Thread per l'aggiornamento delle statistiche"""
+        self.show_progress(True)
         
-        # Carica solo i nuovi video
-        for i in range(0, len(new_video_ids), 50):
-            batch_ids = new_video_ids[i:i+50]
-            
-            retry_count = 0
-            while retry_count < 3:  # Max 3 tentativi
-                try:
-                    self.rate_limit()
-                    response = youtube.videos().list(
-                        part='snippet,statistics,contentDetails',
-                        id=','.join(batch_ids)
-                    ).execute()
-                    self.api_calls_count += 1
-                    
-                    for video in response['items']:
-                        processed = self._process_video_data(video)
-                        if processed:
-                            self._video_cache[processed['video_id']] = processed
-                            self.videos.append(processed)
-                    
-                    break  # Successo, esci dal loop retry
-                    
-                except HttpError as e:
-                    self.debug_info['last_error'] = str(e)
-                    if e.resp.status == 403:
-                        self.debug_info['quota_errors'] += 1
-                        logging.error(f"Quota esaurita su video details batch")
-                        
-                        # Prova a ruotare API key
-                        if self.rotate_api_key():
-                            youtube = self.get_youtube_service()
-                            retry_count += 1
-                            time.sleep(2)
-                            continue
-                        else:
-                            logging.error("Impossibile caricare dettagli video - quota esaurita")
-                            return
-                    else:
-                        self.debug_info['other_errors'] += 1
-                        logging.error(f"Errore batch details: {e}")
-                        break
-                except Exception as e:
-                    logging.error(f"Errore inaspettato batch details: {e}")
-                    break
-    
-    def _process_video_data(self, video):
-        """Processa i dati di un video con gestione errori migliorata"""
         try:
-            video_id = video['id']
-            snippet = video['snippet']
-            stats = video['statistics']
-            content = video['contentDetails']
+            self._sync_loader_keys()
+            summary = self.loader.refresh_statistics()
+            self._invalidate_filter_cache()  # Views e like cambiati sul posto
+            
+            # I record sono aggiornati sul posto: basta riformattare le righe visibili
+            self.root.after(0, self.video_list.refresh)
             
-            published_at = snippet['publishedAt']
-            duration_seconds = self.parse_duration_to_seconds(content['duration'])
+            status_msg = f"Statistiche aggiornate: {summary['refreshed']:,} video - API calls: {summary['api_used']}"
+            if summary['missing']:
+                status_msg += f" | {summary['missing']:,} video non più disponibili"
+            if summary['unrefreshed']:
+                status_msg += f" | ⚠️ {summary['unrefreshed']:,} non aggiornati (quota esaurita o errori API)"
+            self.update_status(status_msg)
             
-            return {
-                'titolo': snippet['title'],
-                'video_id': video_id,
-                'url': f"https://www.youtube.com/watch?v={video_id}",
-                'data_pubblicazione': published_at,
-                'date': datetime.fromisoformat(published_at.replace('Z', '+00:00')).date(),
-                'durata': self.format_duration(duration_seconds),
-                'durata_secondi': duration_seconds,
-                'visualizzazioni': int(stats.get('viewCount', 0)),
-                'like': int(stats.get('likeCount', 0)),
-                'commenti': int(stats.get('commentCount', 0))
-            }
         except Exception as e:
-            print(f"Errore processamento video: {e}")
-            return None
-    
-    @lru_cache(maxsize=1000)
-    def parse_duration_to_seconds(self, duration):
-        """Converte durata ISO 8601 in secondi con caching"""
-        match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', duration)
-        if match:
-            hours, minutes, seconds = match.groups()
-            hours = int(hours or 0)
-            minutes = int(minutes or 0)
-            seconds = int(seconds or 0)
-            return hours * 3600 + minutes * 60 + seconds
-        return 0
-    
-    def format_duration(self, seconds):
-        """Formatta durata da secondi a stringa"""
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        secs = seconds % 60
-        
-        if hours:
-            return f"{hours}:{minutes:02d}:{secs:02d}"
-        else:
-            return f"{minutes}:{secs:02d}"
+            self.update_status(f"Errore: {str(e)}")
+            messagebox.showerror("Errore", str(e))
+        finally:
+            self.show_progress(False)
     
     def parse_duration_input(self, duration_str):
         """Converte input durata utente in secondi"""
@@ -1546,27 +1001,44 @@ Data creazione: {snippet['publishedAt'][:10]}
         except ValueError:
             return None
     
-    def display_videos(self, videos):
-        """Mostra i video nella treeview in modo efficiente"""
-        # Pulisci treeview
-        self.video_tree.delete(*self.video_tree.get_children())
-        
-        # Limita visualizzazione per performance
-        display_limit = 2000
-        display_videos = videos[:display_limit]
-        
-        # Inserisci in batch per migliori performance
-        for i, video in enumerate(display_videos, 1):
-            self.video_tree.insert('', 'end', values=(
-                video['titolo'],
-                f"{video['visualizzazioni']:,}",
-                f"{video['like']:,}",
-                video['data_pubblicazione'][:10],
-                video['durata']
-            ), text=str(i))
-        
-        if len(videos) > display_limit:
-            self.update_status(f"Mostrando primi {display_limit:,} di {len(videos):,} video. Usa filtri per raffinare.")
+    def display_videos(self, indices=None):
+        """Mostra nella lista virtuale i video indicati (indici in self.videos, tutti se None)"""
+        self._view_videos = self.videos
+        if indices is None:
+            indices = np.arange(len(self.videos))
+        if self.sort_column is not None:
+            indices = self._get_columns().sorted_indices(indices, self.sort_column, self.sort_descending)
+        self.view_indices = indices
+        self.video_list.set_count(len(self.view_indices))
+    
+    def sort_videos(self, heading):
+        """Ordina la lista per la colonna cliccata (secondo click: direzione inversa)"""
+        column = SORT_COLUMNS[heading]
+        if self.sort_column == column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column = column
+            self.sort_descending = True
+        
+        arrow = ' ▼' if self.sort_descending else ' ▲'
+        for name, col in SORT_COLUMNS.items():
+            self.video_tree.heading(name, text=name + (arrow if col == column else ''))
+        
+        if self._view_videos is self.videos:
+            self.display_videos(self.view_indices)
+        else:
+            self.display_videos()
+    
+    def _format_video_row(self, row):
+        """Testo e valori di una riga della lista, formattati solo quando visibile"""
+        video = self._view_videos[self.view_indices[row]]
+        return str(row + 1), (
+            video.title,
+            f"{video.views:,}",
+            f"{video.likes:,}",
+            video.published_at[:10],
+            video.duration
+        )
     
     def set_duration_preset(self, min_minutes, max_minutes):
         """Imposta preset di durata"""
@@ -1574,57 +1046,141 @@ Data creazione: {snippet['publishedAt'][:10]}
         self.max_duration_var.set(str(max_minutes) if max_minutes is not None else "")
     
     def apply_filters(self):
-        """Applica filtri in modo ottimizzato"""
+        """Applica subito i filtri (valutati in background)"""
         if not self.videos:
             messagebox.showinfo("Info", "Carica prima i video del canale!")
             return
+        self._cancel_live_filters()
+        self._submit_filters(self._read_filters())
+    
+    def _schedule_live_filters(self):
+        """Riprogramma la valutazione dei filtri dopo l'ultima modifica (debounce)"""
+        if self._filter_after_id is not None:
+            self.root.after_cancel(self._filter_after_id)
+        self._filter_after_id = self.root.after(FILTER_DEBOUNCE_MS, self._run_live_filters)
+    
+    def _run_live_filters(self):
+        self._filter_after_id = None
+        if self.videos:
+            self._submit_filters(self._read_filters())
+    
+    def _cancel_live_filters(self):
+        """Annulla la valutazione programmata e quella eventualmente in corso"""
+        if self._filter_after_id is not None:
+            self.root.after_cancel(self._filter_after_id)
+            self._filter_after_id = None
+        with self._filters_lock:
+            self._filter_generation += 1
+            self._filter_request = None
+    
+    def _read_filters(self):
+        """Legge i campi dei filtri (solo dal thread Tk)"""
+        filters = {
+            'videos': self.videos,
+            'keyword': self.keyword_var.get().strip(),
+            'mode': self.search_mode.get(),
+            'case_sensitive': self.case_sensitive.get(),
+            'whole_word': self.whole_word.get(),
+            'min_views': None,
+            'applied': []
+        }
+        filters_applied = filters['applied']
         
-        # Parti da tutti i video
-        self.filtered_videos = self.videos.copy()
-        filters_applied = []
-        
-        # Filtro keyword ottimizzato
-        keyword = self.keyword_var.get().strip()
-        if keyword:
-            self.filtered_videos = self._filter_by_keyword(keyword)
-            filters_applied.append(f"Keyword: {keyword}")
+        if filters['keyword']:
+            filters_applied.append(f"Keyword: {filters['keyword']}")
         
         # Filtro views
         min_views_str = self.min_views_var.get().strip()
         if min_views_str:
             try:
-                min_views = int(min_views_str.replace(',', '').replace('.', ''))
-                self.filtered_videos = [v for v in self.filtered_videos 
-                                      if v['visualizzazioni'] >= min_views]
-                filters_applied.append(f"Views ≥ {min_views:,}")
+                filters['min_views'] = int(min_views_str.replace(',', '').replace('.', ''))
+                filters_applied.append(f"Views ≥ {filters['min_views']:,}")
             except ValueError:
                 pass
         
         # Filtro durata
         min_dur = self.parse_duration_input(self.min_duration_var.get())
         max_dur = self.parse_duration_input(self.max_duration_var.get())
+        filters['min_duration'], filters['max_duration'] = min_dur, max_dur
         
         if min_dur is not None or max_dur is not None:
-            self.filtered_videos = self._filter_by_duration(min_dur, max_dur)
             dur_info = self._format_duration_filter(min_dur, max_dur)
             filters_applied.append(dur_info)
         
         # Filtro data
         start_date = self._parse_date(self.start_date_var.get())
         end_date = self._parse_date(self.end_date_var.get())
+        filters['start_date'], filters['end_date'] = start_date, end_date
         
         if start_date or end_date:
-            self.filtered_videos = self._filter_by_date(start_date, end_date)
             date_info = self._format_date_filter(start_date, end_date)
             filters_applied.append(date_info)
         
+        return filters
+    
+    def _submit_filters(self, filters):
+        """Consegna i filtri al worker, sostituendo la richiesta precedente"""
+        with self._filters_lock:
+            self._filter_generation += 1
+            self._filter_request = (self._filter_generation, filters)
+        self._filter_wakeup.set()
+        
+        if self._filter_worker is None:
+            self._filter_worker = threading.Thread(target=self._filter_worker_loop)
+            self._filter_worker.daemon = True
+            self._filter_worker.start()
+    
+    def _filter_worker_loop(self):
+        """Worker dei filtri: valuta sempre e solo l'ultima richiesta"""
+        while True:
+            self._filter_wakeup.wait()
+            self._filter_wakeup.clear()
+            with self._filters_lock:
+                request, self._filter_request = self._filter_request, None
+            if request is None:
+                continue
+            
+            generation, filters = request
+            cancelled = lambda: generation != self._filter_generation
+            try:
+                indices = self._evaluate_filters(filters, cancelled)
+            except Exception as e:
+                logging.error(f"Errore nei filtri: {e}")
+                continue
+            if indices is not None and not cancelled():
+                self.root.after(0, self._publish_filters, generation, filters, indices)
+    
+    def _evaluate_filters(self, filters, cancelled):
+        """Indici dei video che passano i filtri (None se la valutazione è stata superata)"""
+        videos = filters['videos']
+        
+        # Filtri numerici e data in un'unica maschera vettoriale
+        indices = self._get_columns(videos).select(
+            min_views=filters['min_views'], min_duration=filters['min_duration'],
+            max_duration=filters['max_duration'], start_date=filters['start_date'], end_date=filters['end_date'])
+        if cancelled():
+            return None
+        
+        # Filtro keyword tramite indice invertito dei titoli
+        if filters['keyword']:
+            indices = self._filter_by_keyword(filters, indices, cancelled)
+        return indices
+    
+    def _publish_filters(self, generation, filters, indices):
+        """Mostra il risultato dei filtri (thread Tk), se è ancora il più recente"""
+        videos = filters['videos']
+        if generation != self._filter_generation or videos is not self.videos:
+            return
+        
+        self.filtered_videos = [videos[i] for i in indices]
+        
         # Mostra risultati
-        self.display_videos(self.filtered_videos)
+        self.display_videos(indices)
         
         # Status
-        status = f"Filtrati: {len(self.filtered_videos):,} di {len(self.videos):,} video"
-        if filters_applied:
-            status += f" | {' | '.join(filters_applied)}"
+        status = f"Filtrati: {len(self.filtered_videos):,} di {len(videos):,} video"
+        if filters['applied']:
+            status += f" | {' | '.join(filters['applied'])}"
         self.update_status(status)
         
         # Abilita export se ci sono risultati
@@ -1632,41 +1188,50 @@ Data creazione: {snippet['publishedAt'][:10]}
             state=tk.NORMAL if self.filtered_videos else tk.DISABLED
         )
     
-    def _filter_by_keyword(self, keyword):
-        """Filtro keyword ottimizzato"""
+    def _get_columns(self, videos=None):
+        """Colonne NumPy dei video caricati, ricostruite se la lista è cambiata"""
+        videos = self.videos if videos is None else videos
+        with self._filters_lock:
+            columns = self._columns
+            # Video aggiunti in coda o in testa: aggiornamento incrementale di colonne e ordinamenti
+            if columns is None or not columns.update(videos):
+                self._columns = columns = VideoColumns(videos)
+            return columns
+    
+    def _invalidate_filter_cache(self):
+        """Scarta colonne e posizioni calcolate per i filtri"""
+        with self._filters_lock:
+            self._columns = None
+            self._title_positions = None
+    
+    def _get_title_positions(self, videos):
+        """Posizioni in ``videos`` dei documenti dell'indice titoli, ricalcolate se qualcosa è cambiato"""
+        index = self.loader.title_index
+        sizes = (len(index), len(videos))
+        with self._filters_lock:
+            cached = self._title_positions
+            if cached is None or cached[0] is not videos or cached[1] is not index or cached[2] != sizes:
+                self._title_positions = cached = (videos, index, sizes, index.positions(videos))
+            return cached[3]
+    
+    def _filter_by_keyword(self, filters, indices, cancelled):
+        """Filtro keyword: restringe gli indici dei video tramite l'indice dei titoli"""
         # Parse keyword
-        keywords, exclude_keywords = self._parse_keywords(keyword)
+        keywords, exclude_keywords = self._parse_keywords(filters['keyword'])
         
         if not keywords and not exclude_keywords:
-            return self.filtered_videos
-        
-        case_sensitive = self.case_sensitive.get()
-        whole_word = self.whole_word.get()
-        mode = self.search_mode.get()
-        
-        filtered = []
-        for video in self.filtered_videos:
-            title = video['titolo']
-            
-            # Check esclusioni
-            if any(self._match_keyword(ex_k, title, case_sensitive, whole_word) 
-                   for ex_k in exclude_keywords):
-                continue
-            
-            # Check inclusioni
-            if keywords:
-                if mode == "AND":
-                    if all(self._match_keyword(k, title, case_sensitive, whole_word) 
-                           for k in keywords):
-                        filtered.append(video)
-                else:  # OR
-                    if any(self._match_keyword(k, title, case_sensitive, whole_word) 
-                           for k in keywords):
-                        filtered.append(video)
-            else:
-                filtered.append(video)
+            return indices
         
-        return filtered
+        # Keyword compilate una sola volta per tutta la ricerca
+        query = TitleQuery(keywords, exclude_keywords, filters['mode'],
+                           case_sensitive=filters['case_sensitive'], whole_word=filters['whole_word'])
+        docs = self.loader.title_index.search(query, cancelled)
+        if docs is None:
+            return None
+        positions = self._get_title_positions(filters['videos'])
+        # Documenti indicizzati dopo il calcolo delle posizioni non sono ancora nella lista
+        positions = positions[docs[docs < len(positions)]]
+        return np.intersect1d(indices, positions[positions >= 0])
     
     def _parse_keywords(self, keyword_str):
         """Parse keywords separando inclusioni ed esclusioni"""
@@ -1696,43 +1261,6 @@ Data creazione: {snippet['publishedAt'][:10]}
         
         return keywords, exclude_keywords
     
-    @lru_cache(maxsize=10000)
-    def _match_keyword(self, keyword, title, case_sensitive, whole_word):
-        """Match keyword con caching"""
-        if not case_sensitive:
-            keyword = keyword.lower()
-            title = title.lower()
-        
-        if whole_word:
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            return bool(re.search(pattern, title, 0 if case_sensitive else re.IGNORECASE))
-        else:
-            return keyword in title
-    
-    def _filter_by_duration(self, min_dur, max_dur):
-        """Filtra per durata"""
-        filtered = []
-        for video in self.filtered_videos:
-            dur = video['durata_secondi']
-            if min_dur is not None and dur < min_dur:
-                continue
-            if max_dur is not None and dur > max_dur:
-                continue
-            filtered.append(video)
-        return filtered
-    
-    def _filter_by_date(self, start_date, end_date):
-        """Filtra per data"""
-        filtered = []
-        for video in self.filtered_videos:
-            video_date = video['date']
-            if start_date and video_date < start_date:
-                continue
-            if end_date and video_date > end_date:
-                continue
-            filtered.append(video)
-        return filtered
-    
     def _parse_date(self, date_str):
         """Parse data con gestione errori"""
         date_str = date_str.strip()
@@ -1746,11 +1274,11 @@ Data creazione: {snippet['publishedAt'][:10]}
     def _format_duration_filter(self, min_dur, max_dur):
         """Formatta info filtro durata"""
         if min_dur is not None and max_dur is not None:
-            return f"Durata: {self.format_duration(min_dur)} - {self.format_duration(max_dur)}"
+            return f"Durata: {format_duration(min_dur)} - {format_duration(max_dur)}"
         elif min_dur is not None:
-            return f"Durata ≥ {self.format_duration(min_dur)}"
+            return f"Durata ≥ {format_duration(min_dur)}"
         else:
-            return f"Durata ≤ {self.format_duration(max_dur)}"
+            return f"Durata ≤ {format_duration(max_dur)}"
     
     def _format_date_filter(self, start_date, end_date):
         """Formatta info filtro data"""
@@ -1772,67 +1300,93 @@ Data creazione: {snippet['publishedAt'][:10]}
         self.search_mode.set("AND")
         self.case_sensitive.set(False)
         self.whole_word.set(False)
+        self._cancel_live_filters()
         
         if self.videos:
             self.filtered_videos = self.videos.copy()
-            self.display_videos(self.videos)
+            self.display_videos()
             self.update_status(f"Totale: {len(self.videos):,} video")
             self.export_filtered_btn.config(state=tk.DISABLED)
     
     def open_video(self, event):
         """Apre il video selezionato"""
-        selection = self.video_tree.selection()
-        if selection:
-            item = self.video_tree.item(selection[0])
-            try:
-                index = int(item['text']) - 1
-                video_list = self.filtered_videos if self.filtered_videos else self.videos
-                
-                if 0 <= index < len(video_list):
-                    webbrowser.open(video_list[index]['url'])
-            except:
-                pass
+        row = self.video_list.selected_row
+        if row is not None and row < len(self.view_indices):
+            # La riga della lista virtuale si mappa sul video tramite l'array di indici
+            webbrowser.open(self._view_videos[self.view_indices[row]].url)
     
     def export_csv(self):
         """Esporta tutti i video"""
-        self._export_to_csv(self.videos, "tutti_video")
+        self._export_videos(self.videos, "tutti_video")
     
     def export_filtered_csv(self):
         """Esporta video filtrati"""
-        self._export_to_csv(self.filtered_videos, "video_filtrati")
+        self._export_videos(self.filtered_videos, "video_filtrati")
     
-    def _export_to_csv(self, videos, default_name):
-        """Export ottimizzato in CSV"""
+    def _export_videos(self, videos, default_name):
+        """Sceglie colonne e file, poi esporta in CSV o NDJSON in background"""
         if not videos:
             messagebox.showwarning("Attenzione", "Nessun video da esportare")
             return
         
-        filename = filedialog.asksaveasfilename(
-            defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
-            initialfile=f"{default_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        )
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Esporta Video")
+        dialog.transient(self.root)
         
-        if filename:
-            try:
-                # Prepara dati per DataFrame
-                data = [{
-                    'Titolo': v['titolo'],
-                    'URL': v['url'],
-                    'Data': v['data_pubblicazione'][:10],
-                    'Durata': v['durata'],
-                    'Views': v['visualizzazioni'],
-                    'Like': v['like'],
-                    'Commenti': v['commenti']
-                } for v in videos]
-                
-                df = pd.DataFrame(data)
-                df.to_csv(filename, index=False, encoding='utf-8-sig')
-                
-                messagebox.showinfo("Successo", 
-                    f"Esportati {len(videos):,} video in:\n{os.path.basename(filename)}")
-            except Exception as e:
-                messagebox.showerror("Errore", f"Errore esportazione: {str(e)}")
+        main_frame = ttk.Frame(dialog, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(main_frame, text="Colonne da esportare:", font=('Arial', 10, 'bold')).pack(anchor=tk.W)
+        
+        selected = getattr(self, 'export_columns', DEFAULT_COLUMNS)
+        column_vars = {}
+        for name, (header, _) in EXPORT_COLUMNS.items():
+            column_vars[name] = tk.BooleanVar(value=name in selected)
+            ttk.Checkbutton(main_frame, text=header, variable=column_vars[name]).pack(anchor=tk.W)
+        
+        def start_export():
+            columns = tuple(name for name, var in column_vars.items() if var.get())
+            if not columns:
+                messagebox.showwarning("Attenzione", "Seleziona almeno una colonna", parent=dialog)
+                return
+            filename = filedialog.asksaveasfilename(
+                parent=dialog,
+                defaultextension=".csv",
+                filetypes=[("CSV files", "*.csv"), ("NDJSON files", "*.ndjson"), ("All files", "*.*")],
+                initialfile=f"{default_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            )
+            if not filename:
+                return
+            self.export_columns = columns
+            dialog.destroy()
+            
+            self.show_progress(True)
+            # Copia dei soli riferimenti: un caricamento in corso non altera l'export
+            thread = threading.Thread(target=self._export_thread, args=(list(videos), filename, columns))
+            thread.daemon = True
+            thread.start()
+        
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=(10, 0))
+        ttk.Button(button_frame, text="Esporta...", command=start_export).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Annulla", command=dialog.destroy).pack(side=tk.RIGHT, padx=5)
+    
+    def _export_thread(self, videos, filename, columns):
+        """Thread per la scrittura a blocchi del file di export"""
+        def on_progress(done, total):
+            self.update_status(f"Esportazione: {done:,}/{total:,} video...")
+        
+        try:
+            count = export_videos(videos, filename, columns=columns, on_progress=on_progress)
+            self.update_status(f"Esportati {count:,} video in {os.path.basename(filename)}")
+            self.root.after(0, lambda: messagebox.showinfo("Successo",
+                f"Esportati {count:,} video in:\n{os.path.basename(filename)}"))
+        except Exception as e:
+            message = f"Errore esportazione: {str(e)}"  # 'e' non esiste più quando gira la callback
+            logging.error(message)
+            self.update_status(message)
+            self.root.after(0, lambda: messagebox.showerror("Errore", message))
+        finally:
+            self.show_progress(False)
     
     def update_status(self, message):
         """Aggiorna status bar"""
@@ -1848,6 +1402,10 @@ Data creazione: {snippet['publishedAt'][:10]}
             self.root.after(0, self.progress.grid_remove)
 
 def main():
+    # Con argomenti da riga di comando esegue il caricamento batch senza GUI
+    if len(sys.argv) > 1:
+        sys.exit(batch_main(sys.argv[1:]))
+    
     # Crea directory per log se non esiste
     log_dir = os.path.dirname(os.path.abspath(__file__))
     os.makedirs(log_dir, exist_ok=True)
@@ -0,0 +1,1664 @@
+"""Motore di caricamento headless per YouTube Channel Analyzer.
+
+Contiene tutta la logica di caricamento (analisi canale, strategie Smart/
+Veloce/Completa, dettagli video) senza dipendenze da Tk: lo stato di
+avanzamento viene notificato tramite eventi, così lo stesso motore può
+essere usato dalla GUI o da un processo batch su server senza display.
+
+Uso da riga di comando:
+    python channel_loader.py canali.txt --strategy smart --output-dir sessioni
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import httplib2
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.errors import HttpError
+
+from checkpoint import CHECKPOINT_DIR, CheckpointJournal, checkpoint_path
+from http_cache import CachedJsonModel, ETagCache, ETagHttp
+from key_pool import KeyPool
+from pipeline import DetailPipeline
+from quota import QUOTA_FILE, QuotaBudgetExceeded, QuotaExhausted, QuotaLedger, quota_cost
+from record_journal import RecordJournal, compact_journal, discard_journal, read_journal, records_path
+from records import VideoRecord, VideoStub
+from session_store import LegacySessionError, SessionReader, read_legacy_session, write_session
+from throttle import QUOTA_EXCEEDED, OVERLOAD_ERRORS, MAX_RETRIES, AdaptiveHttp, AdaptiveLimiter, \
+    backoff_delay, classify_error
+from title_index import TitleIndex
+from video_cache import CACHE_FILE, FRESH, VideoCache, search_page_ttl
+
+CONFIG_FILE = 'youtube_analyzer_config.json'
+
+# Ritmo delle chiamate API: tetto per key; il ritmo effettivo lo trova la finestra AIMD
+MAX_CALLS_PER_SECOND = 50
+INITIAL_CONCURRENCY = 4  # Chiamate contemporanee iniziali (cresce finché l'API non segnala sovraccarico)
+DETAIL_WORKERS = 8  # Thread paralleli per videos().list
+DETAIL_PARTS = 'snippet,statistics,contentDetails'
+DETAIL_BATCH_GROUP = 10  # Batch da 50 ID spediti insieme in una richiesta HTTP multipart
+
+# Planner delle sorgenti: pagine massime per sorgente nelle strategie Smart e Complete
+SMART_SOURCE_PAGES = {'playlist': 200, 'year': 30, 'order': 20}
+COMPLETE_SOURCE_PAGES = {'playlist': 500, 'year': 200, 'order': 100}
+SEARCH_ORDERS = ['date', 'viewCount', 'relevance', 'rating', 'title']
+SEARCH_DEPTH = 500  # Risultati massimi raggiungibili da una singola query search
+# Suddivisione adattiva delle finestre di date per la search
+SEARCH_WINDOW_TARGET = 350  # Video attesi per sotto-finestra (margine sotto SEARCH_DEPTH)
+MAX_WINDOW_SPLIT = 16
+MIN_SEARCH_WINDOW = timedelta(hours=1)
+MIN_NEW_PER_UNIT = 0.01  # Sotto questa resa attesa (1 video nuovo per pagina search) il planner si ferma
+
+_DURATION_RE = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
+
+# Documento discovery di YouTube v3, decodificato una sola volta per processo
+_discovery_lock = threading.Lock()
+_discovery = None
+
+
+def build_service(key, http, model):
+    """Crea il servizio YouTube dal documento discovery statico già decodificato
+
+    Se la libreria non include il documento statico si ripiega su ``build``.
+    """
+    global _discovery
+    with _discovery_lock:
+        if _discovery is None:
+            document = discovery_cache.get_static_doc('youtube', 'v3')
+            if document is None:
+                return build('youtube', 'v3', developerKey=key, http=http, model=model)
+            _discovery = json.loads(document)
+        return build_from_document(_discovery, developerKey=key, http=http, model=model)
+
+
+class ChannelLoader:
+    """Carica canale e video senza toccare widget.
+
+    Ogni aggiornamento di stato viene inviato a ``on_event(evento, dati)``:
+    - ``'status'``: messaggio testuale con contatori di avanzamento
+    - ``'key_rotated'``: cambio della API key attiva
+    """
+
+    def __init__(self, api_keys, current_key_index=0, on_event=None, detail_workers=DETAIL_WORKERS,
+                 pipelined=True, video_cache=None, quota=None, quota_budget=None,
+                 batch_group=DETAIL_BATCH_GROUP, checkpoint_dir=CHECKPOINT_DIR, keep_videos=True):
+        # Quota in unità: registro per endpoint/key e budget per caricamento (None = illimitato)
+        self.quota = quota if quota is not None else QuotaLedger()
+        self.quota_budget = quota_budget
+        self._budget_start = None  # quota.total_units all'inizio del caricamento in corso
+
+        # Key usate in parallelo dai worker, ognuna col proprio ritmo; la key "corrente"
+        # è quella delle enumerazioni sequenziali (playlist, search)
+        self.key_pool = KeyPool(api_keys, self.quota, MAX_CALLS_PER_SECOND, capacity=detail_workers)
+        # Finestra di concorrenza condivisa da tutte le richieste HTTP (worker + enumerazione)
+        self.limiter = AdaptiveLimiter(initial=min(INITIAL_CONCURRENCY, detail_workers + 1),
+                                       maximum=detail_workers + 1)
+        self.current_api_key_index = current_key_index if current_key_index < len(self.api_keys) else 0
+        self.on_event = on_event
+        # Per thread: un pool di connessioni e un servizio già pronto per ogni key (httplib2 non è thread-safe)
+        self._local = threading.local()
+        self._lock = threading.Lock()  # Protegge contatori e debug_info
+
+        self.channel_data = None
+        self.videos = []
+        self.api_calls_count = 0
+
+        # Cache per ottimizzazione
+        self._video_cache = {}
+        # Pagine di search().list per parametri normalizzati: chiave -> (scadenza, pagina compatta)
+        self._search_cache = {}
+        self.search_cache_hits = 0
+        self.video_cache = video_cache  # Cache persistente su disco (opzionale)
+        self.persistent_cache_hits = 0
+        # Risposte con ETag per le richieste condizionali (su disco se c'è la cache persistente)
+        self.etag_cache = ETagCache(video_cache)
+        self._json_model = CachedJsonModel(self.etag_cache)
+        # Video in attesa di una risposta part='statistics': video_id -> (record, da aggiungere a self.videos)
+        self._stats_pending = {}
+        # ID dei batch a cui l'API ha risposto, tenuti solo durante refresh_statistics
+        self._answered = None
+        # Indice invertito dei titoli, aggiornato man mano che arrivano i video
+        self.title_index = TitleIndex()
+
+        # Pipeline per i dettagli video
+        self.detail_workers = detail_workers
+        self.batch_group = batch_group  # 1 = una richiesta HTTP per ogni batch di 50 ID
+        # Se False ogni batch viene atteso subito (enumerazione e idratazione in serie)
+        self.pipelined = pipelined
+        self._pipeline = None
+
+        # Journal dei checkpoint del caricamento in corso (None = disattivato o nessun caricamento)
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoints = None
+        # Journal dei video idratati: resta su disco finché i video non vengono salvati in una sessione
+        self.record_journal = None
+        self.record_journal_path = None
+        # Con keep_videos=False (senza GUI) i video completi restano solo nel journal e
+        # self.videos tiene ID e data; la sessione si scrive compattando il journal
+        self.keep_videos = keep_videos
+        self._videos_in_journal = False
+        self._interrupted = False  # Quota o budget esauriti: il caricamento va ripreso
+        self.debug_info = {
+            'playlist_pages': 0,
+            'search_pages': 0,
+            'quota_errors': 0,
+            'overload_errors': 0,  # rateLimitExceeded, 429 e 5xx arrivati al loader
+            'other_errors': 0,
+            'last_error': '',
+            'strategies_used': []
+        }
+
+    def emit(self, event, **data):
+        """Notifica un evento all'osservatore, se presente"""
+        if self.on_event:
+            self.on_event(event, data)
+
+    def update_status(self, message):
+        """Emette un evento di stato con i contatori correnti"""
+        self.emit('status', message=message, videos=len(self.videos),
+                  api_calls=self.api_calls_count)
+
+    def close(self):
+        """Completa e termina l'eventuale pipeline dei dettagli"""
+        if self._pipeline:
+            self._pipeline.close()
+            self._pipeline = None
+
+    @contextmanager
+    def _detail_stage(self):
+        """Mantiene attiva la pipeline dei dettagli per la durata del blocco (rientrante)"""
+        if self._pipeline:
+            yield self._pipeline
+            return
+        self._pipeline = DetailPipeline(self._fetch_video_group, self._store_video_items,
+                                        workers=self.detail_workers, group_size=self.batch_group)
+        try:
+            yield self._pipeline
+        finally:
+            self.close()
+
+    def _wait_details(self):
+        """Attende i dettagli ancora in coda, così len(self.videos) è aggiornato"""
+        if self._pipeline:
+            self._pipeline.join()
+
+    def _count_call(self, endpoint, key_index=None):
+        """Conta una chiamata riuscita e ne registra il costo in unità per endpoint e key"""
+        with self._lock:
+            self.api_calls_count += 1
+        if key_index is None:
+            key_index = self.current_api_key_index
+        key = self.api_keys[key_index] if key_index < len(self.api_keys) else ''
+        self.quota.record(endpoint, key)
+
+    def _acquire(self, endpoint):
+        """Attende il turno per una chiamata, verificando prima il budget di quota del caricamento"""
+        if self.budget_left() < quota_cost(endpoint):
+            raise QuotaBudgetExceeded(f"Budget di {self.quota_budget:,} unità raggiunto")
+        if self.api_keys and not self.key_pool.is_healthy(self.current_api_key_index):
+            # La key corrente è in pausa: passa a una sana; senza key sane il caricamento
+            # è già segnato come interrotto da rotate_api_key
+            if not self.rotate_api_key():
+                raise QuotaExhausted("Quota API esaurita su tutte le keys")
+        self.key_pool.wait(self.current_api_key_index)
+
+    def budget_left(self):
+        """Unità ancora spendibili nel caricamento in corso (infinite senza budget)"""
+        if self.quota_budget is None or self._budget_start is None:
+            return float('inf')
+        return self.quota_budget - (self.quota.total_units - self._budget_start)
+
+    def _note_error(self, counter, error):
+        """Registra un errore API in debug_info (thread-safe)"""
+        with self._lock:
+            self.debug_info['last_error'] = str(error)
+            self.debug_info[counter] += 1
+
+    @property
+    def api_keys(self):
+        return self.key_pool.keys
+
+    @api_keys.setter
+    def api_keys(self, keys):
+        self.key_pool.set_keys(keys)
+
+    @property
+    def current_key(self):
+        """API key attualmente in uso"""
+        return self.api_keys[self.current_api_key_index] if self.api_keys else ''
+
+    def analyze_channel(self, channel_url):
+        """Risolve l'URL e scarica le informazioni del canale"""
+        # Reset cache quando si analizza un nuovo canale
+        self._video_cache.clear()
+        self._search_cache.clear()
+        self.title_index = TitleIndex()
+        self.api_calls_count = 0
+
+        youtube = self.get_youtube_service()
+
+        # Estrai channel ID
+        channel_id = self.extract_channel_id(youtube, channel_url)
+        if not channel_id:
+            return None
+
+        # Ottieni info canale
+        self._acquire('channels.list')
+        response = youtube.channels().list(
+            part='snippet,statistics,contentDetails',
+            id=channel_id
+        ).execute()
+        self._count_call('channels.list')
+
+        self.channel_data = response['items'][0] if response['items'] else None
+        return self.channel_data
+
+    def load_videos(self, strategy):
+        """Carica i video con la strategia indicata e restituisce un riepilogo"""
+        # La strategia incrementale parte dai video già caricati (sessione)
+        if strategy == "incremental" and not self.videos:
+            self.update_status("Nessun video già caricato: aggiornamento incrementale non possibile, uso Smart")
+            strategy = "smart"
+        if strategy != "incremental":
+            self.videos = []
+        start_api_calls = self.api_calls_count
+        start_units = self._budget_start = self.quota.total_units
+
+        youtube = self.get_youtube_service()
+        total_video_count = int(self.channel_data['statistics'].get('videoCount', 0))
+
+        # Avviso per canali molto grandi
+        if total_video_count > 10000:
+            self.update_status(f"⚠️ Canale con {total_video_count:,} video rilevato...")
+            if strategy == "complete":
+                self.update_status("🚨 Strategia Complete per canale grande: potrebbe richiedere 30+ minuti!")
+
+        completed = False
+        self._interrupted = False
+        self._open_checkpoints(strategy)
+        try:
+            with self._detail_stage():
+                try:
+                    self._resume_from_checkpoint()
+                    if strategy == "fast":
+                        self._load_videos_fast(youtube)
+                    elif strategy == "incremental":
+                        self._load_new_uploads(youtube)
+                    elif strategy == "complete":
+                        self._load_videos_complete(youtube, total_video_count)
+                    else:  # smart
+                        self._load_videos_smart(youtube, total_video_count)
+                except QuotaBudgetExceeded as e:
+                    self._interrupted = True
+                    logging.warning(str(e))
+                    self.update_status(f"⚠️ {e}: caricamento interrotto")
+            completed = not self._interrupted
+        finally:
+            self._budget_start = None
+            self.quota.save()
+            checkpoint = self._close_checkpoints(completed)
+
+        # Ordina i video per data (più recenti prima)
+        self.videos.sort(key=lambda x: x.published_at, reverse=True)
+
+        completeness = (len(self.videos) / total_video_count * 100) if total_video_count > 0 else 100
+        return {
+            'strategy': strategy,
+            'total': total_video_count,
+            'loaded': len(self.videos),
+            'completeness': completeness,
+            'api_used': self.api_calls_count - start_api_calls,
+            'quota_used': self.quota.total_units - start_units,
+            'checkpoint': checkpoint,
+            'journal': self.record_journal_path,
+            'missing_analysis': self._analyze_missing_videos()
+        }
+
+    def _open_checkpoints(self, strategy):
+        """Apre (o riprende) il journal dei checkpoint e quello dei video del canale per la strategia"""
+        self.checkpoints = None
+        self.record_journal = None
+        self._videos_in_journal = False
+        channel_id = self._get_channel_id()
+        if self.checkpoint_dir is None or strategy == 'incremental' or not channel_id:
+            return  # L'incrementale si ferma già al primo video noto
+        try:
+            self.checkpoints = CheckpointJournal(checkpoint_path(self.checkpoint_dir, channel_id, strategy))
+            path = records_path(self.checkpoint_dir, channel_id, strategy)
+            # Il journal dei video si riprende solo insieme ai checkpoint, altrimenti riparte vuoto
+            self.record_journal = RecordJournal(path, self.channel_data, resume=self.checkpoints.resumable)
+            self.record_journal_path = path
+        except OSError as e:
+            logging.warning(f"Checkpoint non disponibili: {e}")
+        self._videos_in_journal = not self.keep_videos and self.record_journal is not None
+
+    def _close_checkpoints(self, completed):
+        """Cancella il journal se il caricamento è concluso, altrimenti lo conserva e ne restituisce il percorso"""
+        if self.record_journal is not None:
+            self.record_journal.close()
+            self.record_journal = None
+        journal, self.checkpoints = self.checkpoints, None
+        if journal is None:
+            return None
+        if completed:
+            journal.discard()
+            return None
+        journal.close()
+        self.update_status("💾 Caricamento interrotto: checkpoint salvato, ricarica con la stessa strategia per riprendere")
+        return journal.path
+
+    def _resume_from_checkpoint(self):
+        """Ripristina i video di un caricamento interrotto: dal journal dei video, poi dalle cache"""
+        journal = self.checkpoints
+        if journal is None or not journal.resumable:
+            return
+        self._restore_journal_records()
+        known = {v.video_id for v in self.videos}
+        missing = sorted(journal.video_ids() - known)
+        self.update_status(f"♻️ Ripresa dal checkpoint: {len(journal.done)} fasi completate, "
+                           f"{len(missing):,} video da ripristinare...")
+        self._load_video_details_batch(missing)
+        self._wait_details()
+
+    def _restore_journal_records(self, chunk=1000):
+        """Rilegge in streaming i video già scritti nel journal, senza riscriverli"""
+        if self.record_journal_path is None or not os.path.exists(self.record_journal_path):
+            return
+        try:
+            _, rows = read_journal(self.record_journal_path)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Journal dei video non leggibile: {e}")
+            return
+        known = {v.video_id for v in self.videos}
+        restored = []
+        for fields in rows:
+            if fields['video_id'] in known:
+                continue
+            known.add(fields['video_id'])
+            restored.append(VideoRecord(**fields))
+            if len(restored) >= chunk:
+                self._add_videos(restored, journal=False)
+                restored = []
+        self._add_videos(restored, journal=False)
+
+    def _checkpoint(self, event, *args):
+        """Registra un evento (record_found, page, split, finish) nel journal, se attivo"""
+        if self.checkpoints is not None:
+            getattr(self.checkpoints, event)(*args)
+
+    def _checkpoint_done(self, source):
+        return self.checkpoints is not None and source in self.checkpoints.done
+
+    def _resume_point(self, source):
+        """(token, avanzamento) da cui riprendere una sorgente"""
+        return self.checkpoints.resume_point(source) if self.checkpoints is not None else (None, 0)
+
+    def refresh_statistics(self):
+        """Aggiorna solo views/like/commenti dei video già caricati (part='statistics')"""
+        start_api_calls = self.api_calls_count
+        video_ids = []
+        for video in self.videos:
+            self._stats_pending[video.video_id] = (video, False)
+            video_ids.append(video.video_id)
+        
+        self.update_status(f"Aggiornamento statistiche di {len(video_ids):,} video...")
+        self._interrupted = False
+        self._answered = set()
+        try:
+            with self._detail_stage() as pipeline:
+                for i in range(0, len(video_ids), 50):
+                    pipeline.submit(video_ids[i:i+50], 'statistics')
+        finally:
+            answered, self._answered = self._answered, None
+        
+        # Rimasti in sospeso: omessi da una risposta (eliminati o diventati privati) oppure
+        # mai aggiornati perché il loro batch non ha avuto risposta (quota esaurita, errori)
+        missing = unrefreshed = 0
+        for vid, (_, is_new) in self._stats_pending.items():
+            if not is_new:
+                if vid in answered:
+                    missing += 1
+                else:
+                    unrefreshed += 1
+        self._stats_pending = {vid: p for vid, p in self._stats_pending.items() if p[1]}
+        
+        refreshed = len(video_ids) - missing - unrefreshed
+        api_used = self.api_calls_count - start_api_calls
+        self.quota.save()
+        logging.info(f"Statistiche aggiornate: {refreshed:,} video, {missing:,} non restituiti, "
+                     f"{unrefreshed:,} non aggiornati, API calls: {api_used}")
+        return {
+            'refreshed': refreshed,
+            'missing': missing,
+            'unrefreshed': unrefreshed,
+            'api_used': api_used
+        }
+
+    def save_session(self, filename, channel_url):
+        """Salva la sessione corrente nel formato colonnare"""
+        meta = {
+            'channel_url': channel_url,
+            'channel_data': self.channel_data,
+            'api_calls_count': self.api_calls_count,
+            'debug_info': self.debug_info,
+            'timestamp': datetime.now().isoformat()
+        }
+        if self._videos_in_journal:
+            # I video completi sono solo nel journal: la sessione si scrive in streaming da lì
+            compact_journal(self.record_journal_path, filename, meta=meta)
+        else:
+            write_session(filename, meta, [v.fields() for v in self.videos])
+        logging.info(f"Sessione salvata: {filename}")
+        # I video sono ora nella sessione: il journal dell'ultimo caricamento non serve più,
+        # salvo che il caricamento sia stato interrotto (la ripresa riparte da lì)
+        if self.record_journal_path is not None and self.record_journal is None and not self._interrupted:
+            discard_journal(self.record_journal_path)
+            self.record_journal_path = None
+            self._videos_in_journal = False
+
+    def open_session(self, filename):
+        """Apre una sessione e ne ripristina subito i metadati; i video si leggono con read_session_videos
+
+        Solleva LegacySessionError per le sessioni pickle del vecchio formato.
+        """
+        reader = SessionReader(filename)
+        meta = reader.meta
+        self.channel_data = meta['channel_data']
+        self.api_calls_count = meta.get('api_calls_count', 0)
+        self.debug_info = {**self.debug_info, **meta.get('debug_info', {})}
+        return reader
+
+    def read_session_videos(self, reader):
+        """Decodifica le colonne della sessione e popola i video caricati"""
+        with reader:
+            self.videos = [VideoRecord(**fields) for fields in reader.records()]
+        self._video_cache = {v.video_id: v for v in self.videos}
+        self.record_journal_path = None  # Il journal appartiene ai video sostituiti
+        self._videos_in_journal = False
+        self._reindex_titles()
+        logging.info(f"Sessione caricata: {reader.filename}")
+
+    def load_session(self, filename, allow_legacy=False):
+        """Ripristina completamente una sessione salvata e ne restituisce i metadati"""
+        try:
+            reader = self.open_session(filename)
+        except LegacySessionError:
+            if not allow_legacy:
+                raise
+            return self.load_legacy_session(filename)
+        self.read_session_videos(reader)
+        return reader.meta
+
+    def load_legacy_session(self, filename):
+        """Importa una sessione pickle del vecchio formato (solo da file affidabili)"""
+        session_data = read_legacy_session(filename)
+
+        self.channel_data = session_data['channel_data']
+        self.videos = [VideoRecord(
+            video_id=v['video_id'],
+            title=v['titolo'],
+            published_at=v['data_pubblicazione'],
+            duration_seconds=v['durata_secondi'],
+            views=v['visualizzazioni'],
+            likes=v['like'],
+            comments=v['commenti']
+        ) for v in session_data['videos']]
+        self._video_cache = {v.video_id: v for v in self.videos}
+        self.record_journal_path = None
+        self._videos_in_journal = False
+        self._reindex_titles()
+        self.api_calls_count = session_data.get('api_calls_count', 0)
+        self.debug_info = {**self.debug_info, **session_data.get('debug_info', {})}
+        logging.warning(f"Sessione pickle importata (vecchio formato): {filename}")
+        return session_data
+
+    def _reindex_titles(self):
+        """Ricostruisce l'indice dei titoli dai video caricati"""
+        self.title_index = TitleIndex()
+        self.title_index.add(self.videos)
+
+    def _add_videos(self, records, journal=True):
+        """Aggiunge video ai caricati, alla cache in memoria e all'indice dei titoli
+
+        Con ``journal`` il batch viene anche scritto nel journal dei video del caricamento.
+        """
+        if journal and self.record_journal is not None:
+            self.record_journal.append(records)
+        if self._videos_in_journal:
+            # Senza GUI: in memoria restano solo ID e data, usati da ricerche e planner
+            self.videos.extend(VideoStub(record.video_id, record.published_at) for record in records)
+            return
+        for record in records:
+            self._video_cache[record.video_id] = record
+        self.videos.extend(records)
+        self.title_index.add(records)
+
+    def rotate_api_key(self, failed_index=None):
+        """Mette in pausa la key esaurita e passa alla prossima key sana
+        
+        ``failed_index`` è la key che ha restituito l'errore (default: quella
+        corrente): se la key corrente è ancora sana, perché un altro thread ha
+        già ruotato, non si ruota una seconda volta.
+        """
+        with self._lock:
+            if failed_index is None:
+                failed_index = self.current_api_key_index
+            if 0 <= failed_index < len(self.api_keys):
+                self.key_pool.mark_exhausted(failed_index)
+            if self.key_pool.is_healthy(self.current_api_key_index):
+                return True
+            index = self.key_pool.next_healthy(self.current_api_key_index)
+            if index is None:
+                self._interrupted = True
+                return False
+            self.current_api_key_index = index
+        
+        logging.info(f"Rotazione API Key: passato a Key {self.current_api_key_index + 1}")
+        self.emit('key_rotated', index=self.current_api_key_index, key=self.current_key)
+        self.update_status(f"Cambiata API Key: usando Key {self.current_api_key_index + 1}")
+        
+        return True
+    
+    def get_youtube_service(self, key_index=None):
+        """Servizio YouTube del thread corrente per la key indicata (default: quella corrente)
+
+        Alla prima chiamata di un thread vengono creati il suo pool di connessioni
+        e un servizio per ogni key, così la rotazione è solo una ricerca nel dizionario.
+        """
+        local = self._local
+        if getattr(local, 'services', None) is None:
+            local.http = ETagHttp(AdaptiveHttp(httplib2.Http(), self.limiter), self.etag_cache)
+            local.services = {key: build_service(key, local.http, self._json_model) for key in self.api_keys}
+            logging.info(f"Servizi YouTube pronti per {len(local.services)} key "
+                         f"({threading.current_thread().name})")
+        key = self.current_key if key_index is None else self.api_keys[key_index]
+        youtube = local.services.get(key)
+        if youtube is None:
+            # Key aggiunta dopo la creazione dei servizi del thread
+            youtube = local.services[key] = build_service(key, local.http, self._json_model)
+        return youtube
+    
+    def extract_channel_id(self, youtube, channel_url):
+        """Estrae l'ID del canale dall'URL in modo efficiente"""
+        # Patterns per diversi tipi di URL YouTube
+        patterns = [
+            (r'youtube\.com/channel/([a-zA-Z0-9_-]+)', 'direct'),
+            (r'youtube\.com/c/([a-zA-Z0-9_-]+)', 'custom'),
+            (r'youtube\.com/@([a-zA-Z0-9_.-]+)', 'handle'),
+            (r'youtube\.com/user/([a-zA-Z0-9_-]+)', 'user'),
+            (r'youtube\.com/([a-zA-Z0-9_-]+)$', 'simple')
+        ]
+        
+        for pattern, type_match in patterns:
+            match = re.search(pattern, channel_url)
+            if match:
+                identifier = match.group(1)
+                
+                if type_match == 'direct':
+                    return identifier
+                
+                # Per handle, prova prima il metodo più efficiente
+                if type_match == 'handle':
+                    try:
+                        self._acquire('channels.list')
+                        response = youtube.channels().list(
+                            part='id',
+                            forHandle=identifier,
+                            maxResults=1
+                        ).execute()
+                        self._count_call('channels.list')
+                        
+                        if response['items']:
+                            return response['items'][0]['id']
+                    except Exception as e:
+                        logging.error(f"Errore nella ricerca handle: {e}")
+                        pass
+                
+                # Usa search come fallback
+                try:
+                    self._acquire('search.list')
+                    response = youtube.search().list(
+                        part='snippet',
+                        q=identifier,
+                        type='channel',
+                        maxResults=1
+                    ).execute()
+                    self._count_call('search.list')
+                    
+                    if response['items']:
+                        return response['items'][0]['snippet']['channelId']
+                        
+                except Exception as e:
+                    logging.error(f"Errore nella ricerca del canale: {e}")
+                    continue
+        
+        return None
+    
+    def _analyze_missing_videos(self):
+        """Analizza perché alcuni video non vengono trovati"""
+        if not self.channel_data:
+            return None
+            
+        total_declared = int(self.channel_data['statistics'].get('videoCount', 0))
+        total_found = len(self.videos)
+        missing = total_declared - total_found
+        
+        if missing > 0:
+            logging.warning(f"Video mancanti: {missing:,} ({missing/total_declared*100:.1f}%)")
+            
+            # Analizza distribuzione temporale
+            if self.videos:
+                oldest_date = min(v.published_at for v in self.videos)
+                newest_date = max(v.published_at for v in self.videos)
+                
+                # Conta video per anno
+                year_counts = defaultdict(int)
+                for v in self.videos:
+                    year = int(v.published_at[:4])
+                    year_counts[year] += 1
+                
+                # Trova anni con pochi video (possibili gap)
+                avg_per_year = total_found / len(year_counts) if year_counts else 0
+                gaps = []
+                for year in range(min(year_counts.keys()), max(year_counts.keys()) + 1):
+                    if year_counts[year] < avg_per_year * 0.5:
+                        gaps.append((year, year_counts[year]))
+                
+                logging.info(f"Range video trovati: {oldest_date[:10]} - {newest_date[:10]}")
+                logging.info(f"Anni con pochi video (possibili gap): {gaps}")
+                
+                # Possibili cause
+                causes = []
+                if int(oldest_date[:4]) > 2010:
+                    causes.append("Video più vecchi del 2010 potrebbero non essere indicizzati")
+                if missing > total_found * 0.5:
+                    causes.append("Possibili video privati/eliminati/non listati")
+                if self.debug_info['quota_errors'] > 0:
+                    causes.append(f"Quota API esaurita {self.debug_info['quota_errors']} volte")
+                if total_declared > 50000:
+                    causes.append("YouTube API limita i risultati per canali molto grandi")
+                if 'La7' in self.channel_data['snippet']['title'] or total_declared > 100000:
+                    causes.append("Canali broadcast TV hanno spesso metadati non standard")
+                    
+                # Controlla se ci sono limiti API specifici
+                if len(self.videos) > 0:
+                    # YouTube Search API ha un limite non documentato di ~500-1000 pagine
+                    if self.debug_info['search_pages'] > 400:
+                        causes.append("Raggiunto limite pagine Search API (~500 pagine)")
+                    if self.debug_info['playlist_pages'] > 400:
+                        causes.append("Raggiunto limite pagine Playlist API")
+                    
+                logging.info(f"Possibili cause video mancanti: {', '.join(causes)}")
+                
+                return {
+                    'missing': missing,
+                    'percentage': missing/total_declared*100,
+                    'date_range': (oldest_date[:10], newest_date[:10]),
+                    'gaps': gaps,
+                    'causes': causes
+                }
+        return None
+    
+    def _load_videos_smart(self, youtube, total_count):
+        """Strategia smart: bilancia completezza e efficienza"""
+        if total_count <= 500:
+            # Per canali piccoli usa playlist API
+            self._load_from_playlist(youtube, max_pages=20)
+        elif total_count <= 3000:
+            # Per canali medi usa combinazione
+            self._load_from_playlist(youtube, max_pages=60)
+            if len(self.videos) < total_count * 0.8:
+                self._load_from_search(youtube, max_results=1000)
+        else:
+            # Per canali grandi usa strategia mista ottimizzata
+            self.update_status(f"📊 Canale grande ({total_count:,} video). Caricamento ottimizzato...")
+            
+            # Playlist e ricerche scelte per resa attesa (video nuovi per unità di quota)
+            self._load_planned(total_count, target=min(total_count * 0.95, 60000),
+                               max_pages=SMART_SOURCE_PAGES)
+    
+    def _load_videos_fast(self, youtube):
+        """Strategia veloce: carica solo i video più recenti"""
+        self._load_from_playlist(youtube, max_pages=60)
+    
+    def _load_videos_complete(self, youtube, total_count):
+        """Strategia completa: prova a caricare tutti i video"""
+        self.update_status("⚠️ Modalità Complete: potrebbe richiedere molto tempo e molte API calls...")
+        self._load_planned(total_count, target=total_count, max_pages=COMPLETE_SOURCE_PAGES)
+    
+    def _load_new_uploads(self, youtube):
+        """Strategia incrementale: scorre la playlist uploads solo fino al primo video già noto"""
+        playlist_id = self.channel_data['contentDetails']['relatedPlaylists']['uploads']
+        known_ids = {v.video_id for v in self.videos}
+        existing_videos = self.videos
+        self.videos = []  # Qui il sink raccoglie solo i nuovi video
+        
+        next_page_token = None
+        page_count = 0
+        reached_known = False
+        
+        while not reached_known:
+            try:
+                self._acquire('playlistItems.list')
+                response = youtube.playlistItems().list(
+                    part='contentDetails',
+                    playlistId=playlist_id,
+                    maxResults=50,
+                    pageToken=next_page_token
+                ).execute()
+                self._count_call('playlistItems.list')
+                page_count += 1
+                self.debug_info['playlist_pages'] += 1
+                
+                # La playlist uploads è in ordine dal più recente: ci si ferma al primo video noto
+                new_video_ids = []
+                for item in response['items']:
+                    video_id = item['contentDetails']['videoId']
+                    if video_id in known_ids:
+                        reached_known = True
+                        break
+                    new_video_ids.append(video_id)
+                
+                if new_video_ids:
+                    self._load_video_details_batch(new_video_ids)
+                
+                self.update_status(f"Nuovi video: {len(self.videos)} trovati (pagina {page_count})...")
+                
+                next_page_token = response.get('nextPageToken')
+                if not next_page_token:
+                    break
+                    
+            except QuotaBudgetExceeded as e:
+                # I nuovi video trovati finora vanno comunque uniti a quelli esistenti
+                logging.warning(str(e))
+                self.update_status(f"⚠️ {e}: aggiornamento incrementale parziale")
+                break
+            except HttpError as e:
+                if classify_error(e) == QUOTA_EXCEEDED:
+                    self._note_error('quota_errors', e)
+                    logging.error(f"Quota esaurita su playlist incrementale (pagina {page_count})")
+                    
+                    # Prova a ruotare API key
+                    if self.rotate_api_key():
+                        youtube = self.get_youtube_service()
+                        self.update_status("Quota esaurita, cambio API key...")
+                        continue
+                    else:
+                        self.update_status("⚠️ Quota API esaurita su tutte le keys!")
+                        break
+                else:
+                    self._note_error('other_errors', e)
+                    logging.error(f"Errore playlist incrementale: {e}")
+                    self.videos = existing_videos + self.videos
+                    raise e
+        
+        self._wait_details()
+        logging.info(f"Aggiornamento incrementale: {len(self.videos)} nuovi video in {page_count} pagine")
+        
+        # Nuovi video in testa: load_videos riordina, e con due sequenze già
+        # ordinate il sort di Python si riduce a un merge lineare
+        self.videos.sort(key=lambda x: x.published_at, reverse=True)
+        self.videos = self.videos + existing_videos
+    
+    def _load_from_playlist(self, youtube, max_pages=None):
+        """Carica video dalla playlist uploads con gestione quota"""
+        playlist_id = self.channel_data['contentDetails']['relatedPlaylists']['uploads']
+        
+        # Ripresa dal checkpoint di un caricamento interrotto
+        if self._checkpoint_done('playlist'):
+            return
+        next_page_token, page_count = self._resume_point('playlist')
+        if next_page_token:
+            logging.info(f"Ripresa playlist da pagina {page_count} con token: {next_page_token[:20]}...")
+        
+        while True:
+            if max_pages and page_count >= max_pages:
+                break
+                
+            try:
+                self._acquire('playlistItems.list')
+                response = youtube.playlistItems().list(
+                    part='contentDetails',
+                    playlistId=playlist_id,
+                    maxResults=50,
+                    pageToken=next_page_token
+                ).execute()
+                self._count_call('playlistItems.list')
+                page_count += 1
+                self.debug_info['playlist_pages'] += 1
+                
+                video_ids = [item['contentDetails']['videoId'] for item in response['items']]
+                self._checkpoint('record_found', video_ids)
+                
+                if video_ids:
+                    self._load_video_details_batch(video_ids)
+                
+                self.update_status(f"Playlist: {len(self.videos)} video caricati (pagina {page_count})...")
+                
+                next_page_token = response.get('nextPageToken')
+                if not next_page_token:
+                    logging.info(f"Playlist completata dopo {page_count} pagine")
+                    self._checkpoint('finish', 'playlist')
+                    break
+                # Stato per la ripresa
+                self._checkpoint('page', 'playlist', next_page_token, page_count)
+                    
+            except HttpError as e:
+                if classify_error(e) == QUOTA_EXCEEDED:
+                    self._note_error('quota_errors', e)
+                    logging.error(f"Quota esaurita su playlist (pagina {page_count})")
+                    
+                    # Prova a ruotare API key
+                    if self.rotate_api_key():
+                        youtube = self.get_youtube_service()
+                        self.update_status("Quota esaurita, cambio API key...")
+                        continue
+                    else:
+                        self.update_status("⚠️ Quota API esaurita su tutte le keys!")
+                        break
+                else:
+                    self._note_error('other_errors', e)
+                    logging.error(f"Errore playlist: {e}")
+                    raise e
+        
+        self._wait_details()
+    
+    def _load_from_search(self, youtube, max_results=2000):
+        """Carica video usando search API standard"""
+        channel_id = self._get_channel_id()
+        if not channel_id or self._checkpoint_done('search:date'):
+            return
+            
+        next_page_token, results_count = self._resume_point('search:date')
+        existing_ids = {v.video_id for v in self.videos}
+        
+        while results_count < max_results:
+            response, youtube = self._search_page(
+                youtube, "per data",
+                part='id',
+                channelId=channel_id,
+                type='video',
+                maxResults=50,
+                pageToken=next_page_token,
+                order='date'
+            )
+            if response is None:
+                break
+            
+            new_video_ids = self._collect_search_ids(response, existing_ids)
+            results_count += len(new_video_ids)
+            
+            self.update_status(f"Search: {len(self.videos)} video totali...")
+            
+            next_page_token = response.get('nextPageToken')
+            if not next_page_token or len(new_video_ids) == 0:
+                self._checkpoint('finish', 'search:date')
+                break
+            self._checkpoint('page', 'search:date', next_page_token, results_count)
+        
+        self._wait_details()
+    
+    def _load_planned(self, total_count, target, max_pages):
+        """Carica scegliendo di volta in volta la sorgente con più video nuovi attesi per unità di quota
+
+        Sorgenti: playlist uploads, search per anno e per ordinamento.
+        Le stime vengono ricalibrate dopo ogni sorgente con la resa osservata;
+        ci si ferma al raggiungimento di ``target`` video, del budget o quando
+        nessuna sorgente rende abbastanza.
+        """
+        channel_id = self._get_channel_id()
+        existing_ids = {v.video_id for v in self.videos}
+        # Le sorgenti completate in un caricamento interrotto non vengono ripetute
+        sources = [source for source in self._plan_sources(channel_id, max_pages)
+                   if not self._checkpoint_done(source['checkpoint'])]
+        calibration = defaultdict(lambda: 1.0)  # tipo sorgente -> resa osservata / attesa
+        loaded_by_month = defaultdict(int)
+        counted = 0
+        
+        while sources and len(self.videos) < target:
+            # Conteggio per mese e ID noti dei soli video arrivati dall'ultimo giro
+            for video in self.videos[counted:]:
+                loaded_by_month[video.published_at[:7]] += 1
+                existing_ids.add(video.video_id)
+            counted = len(self.videos)
+            
+            # Resa attesa corretta con quella osservata per lo stesso tipo di sorgente
+            estimates = [(per_unit * calibration[source['kind']], expected, source)
+                         for per_unit, expected, source in
+                         self._estimate_sources(sources, total_count, loaded_by_month)
+                         if quota_cost(source['endpoint']) <= self.budget_left()]
+            if not estimates:
+                self.update_status("Budget quota insufficiente per altre ricerche")
+                self._interrupted = True  # Le sorgenti rimaste si riprendono dal checkpoint
+                break
+            per_unit, expected, source = max(estimates, key=lambda e: e[0])
+            if per_unit < MIN_NEW_PER_UNIT:
+                logging.info(f"Planner: resa attesa troppo bassa ({per_unit:.3f} video/unità), stop")
+                break
+            
+            sources.remove(source)
+            if source['kind'] != 'year':  # _search_by_year registra già la propria voce
+                self.debug_info['strategies_used'].append(source['label'])
+            self.update_status(f"🔍 {source['label']} ({len(self.videos):,}/{total_count:,} video, "
+                               f"resa attesa {per_unit:.2f} video/unità)...")
+            videos_before = len(self.videos)
+            units_before = self.quota.total_units
+            errors_before = self.debug_info['quota_errors']
+            
+            source['run'](self.get_youtube_service(), existing_ids)
+            
+            found = len(self.videos) - videos_before
+            units = self.quota.total_units - units_before
+            if expected > 0:
+                observed = found / expected
+                calibration[source['kind']] = min(max(0.5 * calibration[source['kind']] + 0.5 * observed, 0.05), 2.0)
+            logging.info(f"Planner: {source['label']} -> {found} nuovi video con {units} unità")
+            
+            if not found and self.debug_info['quota_errors'] > errors_before:
+                self.update_status("⚠️ Quota API esaurita su tutte le keys!")
+                break
+    
+    def _plan_sources(self, channel_id, max_pages):
+        """Sorgenti candidate per il planner: playlist, anni e ordinamenti di ricerca"""
+        sources = [{
+            'kind': 'playlist', 'label': "Playlist uploads", 'endpoint': 'playlistItems.list',
+            'checkpoint': 'playlist', 'months': None, 'pages': max_pages['playlist'],
+            'run': lambda youtube, ids: self._load_from_playlist(youtube, max_pages=max_pages['playlist'])
+        }]
+        if not channel_id:
+            return sources
+        
+        now = datetime.now()
+        created = self.channel_data['snippet'].get('publishedAt', '2005-04-01')
+        first_year, first_month = int(created[:4]), int(created[5:7])
+        for year in range(first_year, now.year + 1):
+            start_month = first_month if year == first_year else 1
+            end_month = now.month if year == now.year else 12
+            months = [f"{year}-{m:02d}" for m in range(start_month, end_month + 1)]
+            sources.append({
+                'kind': 'year', 'label': f"Search per anno {year}", 'endpoint': 'search.list',
+                'checkpoint': f"year:{year}", 'months': months, 'pages': max_pages['year'],
+                'run': lambda youtube, ids, y=year: self._search_by_year(youtube, channel_id, y, ids,
+                                                                         max_pages=max_pages['year'])
+            })
+        for order in SEARCH_ORDERS:
+            sources.append({
+                'kind': 'order', 'label': f"Search per ordinamento {order}", 'endpoint': 'search.list',
+                'checkpoint': f"order:{order}", 'months': None, 'pages': max_pages['order'],
+                'run': lambda youtube, ids, o=order: self._search_by_order(youtube, channel_id, o, ids,
+                                                                           max_pages=max_pages['order'])
+            })
+        return sources
+    
+    def _estimate_sources(self, sources, total_count, loaded_by_month):
+        """Stima (video nuovi per unità, video nuovi attesi, sorgente) per ogni sorgente
+
+        I video mancanti vengono distribuiti sui mesi di attività del canale in
+        proporzione al divario tra i video attesi (uniformi) e quelli già caricati.
+        """
+        missing = max(total_count - len(self.videos), 0)
+        all_months = {m for source in sources if source['months'] for m in source['months']}
+        all_months.update(loaded_by_month)
+        per_month = total_count / len(all_months) if all_months else 0
+        gaps = {m: max(per_month - loaded_by_month.get(m, 0), 0) for m in all_months}
+        total_gap = sum(gaps.values())
+        
+        estimates = []
+        for source in sources:
+            if source['months'] is None:
+                # Playlist e ordinamenti coprono tutto il canale
+                window_missing, window_total = missing, max(total_count, 1)
+            else:
+                window_gap = sum(gaps[m] for m in source['months'])
+                window_missing = missing * window_gap / total_gap if total_gap else 0
+                window_total = max(sum(max(per_month, loaded_by_month.get(m, 0)) for m in source['months']), 1)
+            hit_rate = min(window_missing / window_total, 1.0)
+            reachable = min(window_total, source['pages'] * 50)
+            if source['kind'] == 'order':
+                # Gli anni vengono suddivisi in finestre; un ordinamento si ferma alla profondità della search
+                reachable = min(reachable, SEARCH_DEPTH)
+            expected = min(window_missing, reachable * hit_rate)
+            pages = max(-(-reachable // 50), 1)
+            # Costo: pagine della sorgente più i dettagli dei video nuovi (50 per chiamata)
+            units = pages * quota_cost(source['endpoint']) + expected / 50
+            estimates.append((expected / units, expected, source))
+        return estimates
+    
+    def _search_by_year(self, youtube, channel_id, year, existing_ids, max_pages=20):
+        """Cerca i video di un anno, suddividendo adattivamente le finestre dense"""
+        source = f"year:{year}"
+        if self._checkpoint_done(source):
+            return
+        self.debug_info['strategies_used'].append(f"Search per anno {year}")
+        if self._search_by_range(youtube, channel_id, datetime(year, 1, 1), datetime(year + 1, 1, 1),
+                                 existing_ids, max_pages=max_pages, label=f"Anno {year}"):
+            self._checkpoint('finish', source)
+    
+    def _search_by_range(self, youtube, channel_id, start, end, existing_ids, max_pages=20, label="Ricerca"):
+        """Enumera via search i video pubblicati in [start, end) con il minimo di pagine
+
+        La prima pagina di ogni finestra ne dà la stima ``totalResults``: se
+        supera la profondità massima della search la finestra viene divisa
+        (in parti pesate sui video già noti, così i periodi radi confluiscono
+        in finestre larghe); se i video già noti la coprono tutta viene saltata;
+        altrimenti viene sfogliata fino in fondo.
+        
+        Ogni finestra è una sorgente del journal dei checkpoint (suddivisione,
+        token e completamento), così una ripresa non rifà nessuna pagina già letta.
+        Restituisce True se tutto l'intervallo è stato enumerato.
+        """
+        # Date di pubblicazione note, ordinate, per contare i video già caricati in una finestra
+        known = sorted(v.published_at[:19] for v in self.videos)
+        windows = [(start, end)]
+        page_count = 0
+        stopped = False  # Una finestra è rimasta a metà (errore o limite di pagine)
+        
+        while windows and page_count < max_pages:
+            window_start, window_end = windows.pop()
+            window_key = f"{window_start:%Y-%m-%dT%H:%M:%S}/{window_end:%Y-%m-%dT%H:%M:%S}"
+            source = f"window:{window_key}"
+            children = self.checkpoints.splits.get(source) if self.checkpoints is not None else None
+            if children and all(f"{a}/{b}" != window_key for a, b in children):
+                # Suddivisione già decisa in un caricamento precedente: nessuna pagina da rifare
+                windows.extend(reversed([(datetime.fromisoformat(a), datetime.fromisoformat(b))
+                                         for a, b in children]))
+                continue
+            if self._checkpoint_done(source):
+                continue
+            
+            next_page_token, window_pages = self._resume_point(source)
+            if next_page_token is None:
+                response, youtube = self._search_range_page(youtube, channel_id, window_start, window_end)
+                if response is None:
+                    stopped = True
+                    break
+                page_count += 1
+                window_pages = 1
+                self._collect_search_ids(response, existing_ids)
+                
+                total = response.get('pageInfo', {}).get('totalResults', 0)
+                known_in_window = (bisect_left(known, f"{window_end:%Y-%m-%dT%H:%M:%S}")
+                                   - bisect_left(known, f"{window_start:%Y-%m-%dT%H:%M:%S}"))
+                next_page_token = response.get('nextPageToken')
+                
+                if not next_page_token or known_in_window >= total:
+                    self._checkpoint('finish', source)
+                    continue  # Finestra esaurita o già coperta dai video noti
+                if total > SEARCH_DEPTH and window_end - window_start > MIN_SEARCH_WINDOW:
+                    parts = min(max(-(-total // SEARCH_WINDOW_TARGET), 2), MAX_WINDOW_SPLIT)
+                    children = [[f"{a:%Y-%m-%dT%H:%M:%S}", f"{b:%Y-%m-%dT%H:%M:%S}"] for a, b in
+                                self._split_window(window_start, window_end, parts, total, known)]
+                    # Una sotto-finestra uguale alla finestra verrebbe ripresa all'infinito
+                    if len(children) >= 2 and all(f"{a}/{b}" != window_key for a, b in children):
+                        self._checkpoint('split', source, children)
+                        windows.extend(reversed([(datetime.fromisoformat(a), datetime.fromisoformat(b))
+                                                 for a, b in children]))
+                        continue
+                    # Finestra non divisibile: si sfoglia fino alla profondità della search
+                self._checkpoint('page', source, next_page_token, window_pages)
+            
+            # Finestra entro la profondità della search: si sfoglia fino in fondo
+            while next_page_token and page_count < max_pages:
+                response, youtube = self._search_range_page(youtube, channel_id, window_start, window_end,
+                                                            next_page_token)
+                if response is None:
+                    break
+                page_count += 1
+                window_pages += 1
+                self._collect_search_ids(response, existing_ids)
+                next_page_token = response.get('nextPageToken')
+                if next_page_token:
+                    self._checkpoint('page', source, next_page_token, window_pages)
+            
+            if next_page_token:
+                stopped = True
+                break
+            self._checkpoint('finish', source)
+            self.update_status(f"{label}: {len(self.videos)} video totali ({page_count} pagine search)...")
+        
+        self._wait_details()
+        return not windows and not stopped
+    
+    def _split_window(self, start, end, parts, total, known):
+        """Divide [start, end) in ``parts`` finestre con un numero atteso di video simile
+
+        Il peso di ogni tratto è dato dai video noti più la quota non ancora
+        nota distribuita uniformemente nel tempo. Restituisce sempre almeno due
+        finestre strettamente più piccole di [start, end).
+        """
+        cells = parts * 8
+        step = (end - start) / cells
+        bounds = [start + step * c for c in range(cells)] + [end]
+        keys = [f"{b:%Y-%m-%dT%H:%M:%S}" for b in bounds]
+        counts = [bisect_left(known, keys[c + 1]) - bisect_left(known, keys[c]) for c in range(cells)]
+        unknown = max(total - sum(counts), 0) / cells
+        weights = [count + unknown for count in counts]
+        
+        share = sum(weights) / parts
+        windows = []
+        window_start = start
+        accumulated = 0
+        for c in range(cells - 1):
+            accumulated += weights[c]
+            if accumulated >= share * (len(windows) + 1) and len(windows) < parts - 1:
+                windows.append((window_start, bounds[c + 1]))
+                window_start = bounds[c + 1]
+        windows.append((window_start, end))
+        if len(windows) < 2:
+            # Video noti tutti nell'ultimo tratto: la divisione pesata non separa nulla,
+            # si divide a metà nel tempo (al secondo, come le date della search)
+            middle = (start + (end - start) / 2).replace(microsecond=0)
+            windows = [(start, middle), (middle, end)]
+        return windows
+    
+    def _search_range_page(self, youtube, channel_id, start, end, page_token=None):
+        """Una pagina di search (ordine per data) nella finestra [start, end)
+
+        Restituisce (risposta o None, servizio eventualmente ricreato).
+        """
+        return self._search_page(
+            youtube, f"{start:%Y-%m-%d} - {end:%Y-%m-%d}",
+            part='id',
+            channelId=channel_id,
+            type='video',
+            maxResults=50,
+            pageToken=page_token,
+            publishedAfter=f"{start:%Y-%m-%dT%H:%M:%S}Z",
+            publishedBefore=f"{end:%Y-%m-%dT%H:%M:%S}Z",
+            order='date'
+        )
+    
+    def _search_page(self, youtube, label, **params):
+        """Una pagina di search con gestione degli errori per classe e rotazione key su quota
+
+        Restituisce (risposta o None, servizio eventualmente ricreato); con None
+        e quota esaurita su tutte le key il caricamento risulta interrotto.
+        """
+        while True:
+            try:
+                response = self._execute_search(youtube, **params)
+                return response, youtube
+                
+            except HttpError as e:
+                kind = classify_error(e)
+                if kind == QUOTA_EXCEEDED:
+                    self._note_error('quota_errors', e)
+                    logging.error(f"Quota esaurita su search {label}")
+                    
+                    # Prova a ruotare API key
+                    if self.rotate_api_key():
+                        youtube = self.get_youtube_service()
+                        self.update_status("Quota esaurita, cambio API key...")
+                        continue
+                    logging.warning(f"Impossibile completare ricerca {label}")
+                    self.update_status("⚠️ Quota API esaurita su tutte le keys!")
+                else:
+                    self._note_error('overload_errors' if kind in OVERLOAD_ERRORS else 'other_errors', e)
+                    logging.error(f"Errore search {label}: {e}")
+                return None, youtube
+    
+    def _execute_search(self, youtube, **params):
+        """search().list con cache delle pagine (memoria, poi disco) per parametri normalizzati
+
+        Restituisce una pagina compatta con solo id, nextPageToken e pageInfo;
+        le pagine in cache non consumano quota.
+        """
+        key = json.dumps({name: value for name, value in params.items() if value is not None}, sort_keys=True)
+        now = time.time()
+        cached = self._search_cache.get(key)
+        if cached is None and self.video_cache is not None:
+            cached = self.video_cache.get_search_page(key)
+        if cached is not None and cached[0] > now:
+            self._search_cache[key] = cached
+            self.search_cache_hits += 1
+            return cached[1]
+
+        self._acquire('search.list')
+        response = youtube.search().list(**params).execute()
+        self._count_call('search.list')
+        self.debug_info['search_pages'] += 1  # Solo pagine chieste all'API, non quelle in cache
+        page = {
+            'items': [{'id': item['id']} for item in response.get('items', [])],
+            'nextPageToken': response.get('nextPageToken'),
+            'pageInfo': response.get('pageInfo', {})
+        }
+        ttl = search_page_ttl(params.get('publishedBefore'))
+        self._search_cache[key] = (now + ttl, page)
+        if self.video_cache is not None:
+            self.video_cache.put_search_page(key, page, ttl)
+        return page
+    
+    def _collect_search_ids(self, response, existing_ids):
+        """Accoda i dettagli dei video non ancora visti in una pagina di search"""
+        new_video_ids = []
+        for item in response['items']:
+            video_id = item['id']['videoId']
+            if video_id not in existing_ids:
+                new_video_ids.append(video_id)
+                existing_ids.add(video_id)
+        self._checkpoint('record_found', new_video_ids)
+        if new_video_ids:
+            self._load_video_details_batch(new_video_ids)
+        return new_video_ids
+    
+    def _search_by_order(self, youtube, channel_id, order, existing_ids, max_pages=20):
+        """Cerca video con un ordinamento specifico"""
+        source = f"order:{order}"
+        if self._checkpoint_done(source):
+            return
+        next_page_token, page_count = self._resume_point(source)
+        consecutive_empty = 0
+        
+        while page_count < max_pages:
+            response, youtube = self._search_page(
+                youtube, f"per ordinamento {order}",
+                part='id',
+                channelId=channel_id,
+                type='video',
+                maxResults=50,
+                pageToken=next_page_token,
+                order=order
+            )
+            if response is None:
+                break
+            page_count += 1
+            
+            if self._collect_search_ids(response, existing_ids):
+                consecutive_empty = 0
+            else:
+                consecutive_empty += 1
+            
+            next_page_token = response.get('nextPageToken')
+            if consecutive_empty > 3 or not next_page_token:  # Stop se non trova nuovi video
+                self._checkpoint('finish', source)
+                break
+            self._checkpoint('page', source, next_page_token, page_count)
+        
+        self._wait_details()
+    
+    def _get_channel_id(self):
+        """Ottiene l'ID del canale dal channel data"""
+        # Prova prima dal channel data stesso
+        if 'id' in self.channel_data:
+            return self.channel_data['id']
+            
+        # Altrimenti estrai dalla playlist uploads
+        playlist_id = self.channel_data['contentDetails']['relatedPlaylists']['uploads']
+        if playlist_id.startswith('UU'):
+            return 'UC' + playlist_id[2:]
+            
+        return None
+    
+    def _load_video_details_batch(self, video_ids):
+        """Accoda i dettagli video in batch da 50, con caching e gestione quota"""
+        new_video_ids = [vid for vid in video_ids if vid not in self._video_cache]
+        
+        # I video già in cache in memoria si aggiungono subito, anche se altri vanno caricati
+        self._add_videos([self._video_cache[vid] for vid in video_ids if vid in self._video_cache])
+        if not new_video_ids:
+            return
+        
+        # Consulta la cache persistente prima di chiamare l'API
+        stale_ids = []
+        if self.video_cache is not None:
+            cached = self.video_cache.get_many(new_video_ids)
+            fresh = []
+            for vid, (state, fields) in cached.items():
+                record = VideoRecord(vid, **fields)
+                if state == FRESH:
+                    fresh.append(record)
+                else:
+                    self._stats_pending[vid] = (record, True)
+                    stale_ids.append(vid)
+            self._add_videos(fresh)
+            self.persistent_cache_hits += len(cached)
+            new_video_ids = [vid for vid in new_video_ids if vid not in cached]
+        
+        # Carica solo i nuovi video: i batch vengono idratati dalla pipeline
+        with self._detail_stage() as pipeline:
+            for i in range(0, len(new_video_ids), 50):
+                pipeline.submit(new_video_ids[i:i+50])
+            # Per i video in cache con statistiche scadute bastano le statistiche
+            for i in range(0, len(stale_ids), 50):
+                pipeline.submit(stale_ids[i:i+50], 'statistics')
+            if not self.pipelined:
+                pipeline.join()
+    
+    def _store_video_items(self, items):
+        """Stadio sink: normalizza gli item e li aggiunge ai video caricati"""
+        stored = []
+        refreshed = []
+        added = []
+        for video in items:
+            if 'snippet' in video:
+                processed = self._process_video_data(video)
+                if processed:
+                    stored.append(processed)
+            else:
+                # Risposta part='statistics': video dalla cache o già caricato (aggiornato sul posto)
+                processed, is_new = self._stats_pending.pop(video['id'], (None, False))
+                if processed:
+                    self._apply_statistics(processed, video.get('statistics', {}))
+                    refreshed.append(processed)
+                if not is_new:
+                    continue
+            if processed:
+                added.append(processed)
+        self._add_videos(added)
+        
+        if self.video_cache is not None:
+            self.video_cache.put_many(v.fields() for v in stored)
+            self.video_cache.update_stats((v.video_id, v.views, v.likes, v.comments)
+                                          for v in refreshed)
+    
+    def _mark_answered(self, batch_ids):
+        """Registra un batch a cui l'API ha risposto (solo durante refresh_statistics)"""
+        if self._answered is not None:
+            with self._lock:
+                self._answered.update(batch_ids)
+    
+    def _fetch_video_details(self, batch_ids, part=DETAIL_PARTS, quota_exhausted=None):
+        """Esegue videos().list per un batch (nel worker della pipeline) con la key sana meno impegnata"""
+        while True:
+            if quota_exhausted and quota_exhausted.is_set():
+                return []
+            
+            key_index = self.key_pool.acquire()
+            if key_index is None:
+                self._interrupted = True
+                logging.error("Impossibile caricare dettagli video - quota esaurita su tutte le key")
+                if quota_exhausted:
+                    quota_exhausted.set()
+                return []
+            try:
+                response = self.get_youtube_service(key_index).videos().list(
+                    part=part,
+                    id=','.join(batch_ids)
+                ).execute()
+                self._count_call('videos.list', key_index)
+                self._mark_answered(batch_ids)
+                return response['items']
+                
+            except HttpError as e:
+                kind = classify_error(e)
+                if kind == QUOTA_EXCEEDED:
+                    self._note_error('quota_errors', e)
+                    logging.error(f"Quota esaurita su video details batch (Key {key_index + 1})")
+                    # La key va in pausa fino all'azzeramento; il batch riparte con un'altra key
+                    self.rotate_api_key(failed_index=key_index)
+                    continue
+                # I sovraccarichi arrivano qui solo dopo i tentativi con backoff del livello HTTP
+                self._note_error('overload_errors' if kind in OVERLOAD_ERRORS else 'other_errors', e)
+                logging.error(f"Errore batch details ({kind}): {e}")
+                return []
+            except Exception as e:
+                logging.error(f"Errore inaspettato batch details: {e}")
+                return []
+            finally:
+                self.key_pool.release(key_index)
+    
+    def _fetch_video_group(self, jobs, quota_exhausted=None):
+        """Worker della pipeline: idrata più batch con un'unica richiesta HTTP multipart
+
+        Ogni sotto-risposta è gestita a sé: gli errori di quota restano in sospeso
+        e vengono ritentati con un'altra key sana, quelli di sovraccarico dopo un
+        backoff con jitter, gli altri errori scartano solo il proprio batch.
+        """
+        if len(jobs) == 1:
+            batch_ids, args = jobs[0]
+            return self._fetch_video_details(batch_ids, *args, quota_exhausted=quota_exhausted)
+        
+        items = []
+        pending = dict(enumerate(jobs))  # id sotto-richiesta -> (batch_ids, args)
+        attempt = 0  # Tentativi dopo un sovraccarico
+        while pending:
+            if quota_exhausted and quota_exhausted.is_set():
+                return items
+            
+            key_index = self.key_pool.acquire()
+            if key_index is None:
+                self._interrupted = True
+                logging.error("Impossibile caricare dettagli video - quota esaurita su tutte le key")
+                if quota_exhausted:
+                    quota_exhausted.set()
+                return items
+            
+            failures = {}  # id sotto-richiesta rimasta in sospeso -> classe di errore
+            
+            def on_response(request_id, response, exception):
+                kind = classify_error(exception) if isinstance(exception, HttpError) else None
+                if exception is None:
+                    self._count_call('videos.list', key_index)
+                    self._mark_answered(pending[int(request_id)][0])
+                    items.extend(response['items'])
+                elif kind == QUOTA_EXCEEDED or (kind in OVERLOAD_ERRORS and attempt < MAX_RETRIES):
+                    self._note_error('quota_errors' if kind == QUOTA_EXCEEDED else 'overload_errors', exception)
+                    failures[int(request_id)] = kind
+                    return  # Resta in sospeso per un nuovo tentativo
+                else:
+                    self._note_error('other_errors', exception)
+                    logging.error(f"Errore batch details: {exception}")
+                del pending[int(request_id)]
+            
+            try:
+                youtube = self.get_youtube_service(key_index)
+                batch = youtube.new_batch_http_request(callback=on_response)
+                for n, (job_id, (batch_ids, args)) in enumerate(pending.items()):
+                    if n:
+                        self.key_pool.wait(key_index)  # Il primo turno è già stato preso da acquire
+                    batch.add(youtube.videos().list(part=args[0] if args else DETAIL_PARTS,
+                                                    id=','.join(batch_ids)),
+                              request_id=str(job_id))
+                batch.execute()
+            except Exception as e:
+                # Richiesta multipart fallita nel suo insieme: i batch rimasti partono uno per uno
+                logging.warning(f"Richiesta batch non riuscita ({e}): invio dei batch singolarmente")
+                for batch_ids, args in pending.values():
+                    items.extend(self._fetch_video_details(batch_ids, *args, quota_exhausted=quota_exhausted))
+                return items
+            finally:
+                self.key_pool.release(key_index)
+            
+            if QUOTA_EXCEEDED in failures.values():
+                logging.error(f"Quota esaurita su {len(pending)} batch di video details (Key {key_index + 1})")
+                self.rotate_api_key(failed_index=key_index)
+            elif failures:
+                # Sovraccarico segnalato dentro la risposta multipart: finestra ridotta e attesa
+                self.limiter.signal_overload()
+                self.limiter.count_retry()
+                time.sleep(backoff_delay(attempt))
+                attempt += 1
+        return items
+    
+    def _process_video_data(self, video):
+        """Processa i dati di un video con gestione errori migliorata"""
+        try:
+            snippet = video['snippet']
+            stats = video['statistics']
+            
+            return VideoRecord(
+                video_id=video['id'],
+                title=snippet['title'],
+                published_at=snippet['publishedAt'],
+                duration_seconds=self.parse_duration_to_seconds(video['contentDetails']['duration']),
+                views=int(stats.get('viewCount', 0)),
+                likes=int(stats.get('likeCount', 0)),
+                comments=int(stats.get('commentCount', 0))
+            )
+        except Exception as e:
+            logging.error(f"Errore processamento video: {e}")
+            return None
+    
+    def _apply_statistics(self, record, stats):
+        """Aggiorna i contatori di un record da una risposta part='statistics'"""
+        record.views = int(stats.get('viewCount', 0))
+        record.likes = int(stats.get('likeCount', 0))
+        record.comments = int(stats.get('commentCount', 0))
+    
+    def parse_duration_to_seconds(self, duration):
+        """Converte durata ISO 8601 in secondi"""
+        match = _DURATION_RE.match(duration)
+        if match:
+            hours, minutes, seconds = match.groups()
+            hours = int(hours or 0)
+            minutes = int(minutes or 0)
+            seconds = int(seconds or 0)
+            return hours * 3600 + minutes * 60 + seconds
+        return 0
+
+
+def read_api_keys(config_path=CONFIG_FILE):
+    """Legge le API keys dal file di configurazione della GUI"""
+    if not os.path.exists(config_path):
+        return []
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    # Gestisci vecchio formato (singola key)
+    if 'api_key' in config:
+        return [config['api_key']]
+    return config.get('api_keys', [])
+
+
+def read_channel_urls(path):
+    """Legge un file con un URL di canale per riga (ignora righe vuote e #commenti)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f
+                if line.strip() and not line.strip().startswith('#')]
+
+
+def log_event(event, data):
+    """Osservatore di default per l'uso headless: scrive gli eventi nel log"""
+    if event == 'status':
+        logging.info(f"{data['message']} [video: {data['videos']:,}, API calls: {data['api_calls']}]")
+    elif event == 'key_rotated':
+        logging.info(f"API Key attiva: Key {data['index'] + 1}")
+
+
+def run_batch(channel_urls, api_keys, strategy='smart', output_dir='.', on_event=log_event, pipelined=True,
+              video_cache=None, quota=None, quota_budget=None, allow_legacy=False):
+    """Analizza e carica una lista di canali, salvando una sessione per ciascuno
+
+    ``quota_budget`` limita le unità di quota spese nel caricamento di ogni canale;
+    ``allow_legacy`` consente di importare sessioni pickle del vecchio formato
+    (possono eseguire codice: solo da file affidabili).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    results = []
+    key_index = 0
+    quota = quota if quota is not None else QuotaLedger()
+
+    for n, url in enumerate(channel_urls, 1):
+        logging.info(f"[{n}/{len(channel_urls)}] Canale: {url}")
+        # Un loader per canale; l'indice della key prosegue tra i canali
+        # Senza GUI i video caricati vanno solo nel journal (memoria limitata) e la
+        # sessione viene scritta da lì; incremental e stats partono dalla sessione in memoria
+        loader = ChannelLoader(api_keys, key_index, on_event=on_event, pipelined=pipelined,
+                               video_cache=video_cache, quota=quota, quota_budget=quota_budget,
+                               keep_videos=strategy in ('incremental', 'stats'))
+        try:
+            channel_data = loader.analyze_channel(url)
+            if not channel_data:
+                logging.error(f"Canale non trovato: {url}")
+                results.append({'url': url, 'error': 'Canale non trovato'})
+                continue
+
+            filename = os.path.join(output_dir, f"{channel_data['id']}.session")
+            if strategy in ('incremental', 'stats') and os.path.exists(filename):
+                # Riparte dalla sessione precedente mantenendo le info canale aggiornate;
+                # le sessioni pickle si importano solo su richiesta esplicita
+                loader.load_session(filename, allow_legacy=allow_legacy)
+                loader.channel_data = channel_data
+
+            if strategy == 'stats':
+                summary = loader.refresh_statistics()
+                logging.info(f"Statistiche aggiornate per {summary['refreshed']:,} video "
+                             f"({summary['unrefreshed']:,} non aggiornati) - API calls: {summary['api_used']}")
+            else:
+                summary = loader.load_videos(strategy)
+                logging.info(f"Caricati {summary['loaded']:,} video ({summary['completeness']:.1f}%) "
+                             f"- API calls: {summary['api_used']} ({summary['quota_used']:,} unità)")
+            loader.save_session(filename, url)
+
+            summary.update(url=url, title=channel_data['snippet']['title'], session=filename)
+            results.append(summary)
+        except Exception as e:
+            logging.error(f"Errore canale {url}: {e}")
+            results.append({'url': url, 'error': str(e)})
+        finally:
+            key_index = loader.current_api_key_index
+            loader.close()
+
+    logging.info(f"Quota usata oggi: {quota.used_today():,} unità, azzeramento alle "
+                 f"{quota.reset_at.astimezone():%H:%M}")
+    return results
+
+
+def main(argv=None):
+    """Entry point CLI per il caricamento batch senza GUI"""
+    parser = argparse.ArgumentParser(description="Caricamento batch di canali YouTube (senza GUI)")
+    parser.add_argument('channels_file', help="File con un URL di canale per riga")
+    parser.add_argument('--strategy', choices=['smart', 'fast', 'complete', 'incremental', 'stats'],
+                        default='smart',
+                        help="Strategia di caricamento (default: smart); 'incremental' aggiorna la "
+                             "sessione esistente con i soli nuovi upload, 'stats' ne aggiorna solo "
+                             "le statistiche")
+    parser.add_argument('--output-dir', default='sessions',
+                        help="Cartella dove salvare le sessioni (default: sessions)")
+    parser.add_argument('--api-key', action='append', dest='api_keys',
+                        help="API key da usare (ripetibile); default: chiavi del file di configurazione")
+    parser.add_argument('--config', default=CONFIG_FILE, help="File di configurazione con le API keys")
+    parser.add_argument('--cache', default=CACHE_FILE,
+                        help=f"Cache persistente dei metadati video (default: {CACHE_FILE})")
+    parser.add_argument('--no-cache', action='store_true', help="Non usare la cache persistente")
+    parser.add_argument('--no-pipeline', action='store_true',
+                        help="Disattiva la sovrapposizione tra elenco pagine e caricamento dettagli")
+    parser.add_argument('--quota-budget', type=int,
+                        help="Unità di quota massime da spendere per canale (default: nessun limite)")
+    parser.add_argument('--allow-legacy-sessions', action='store_true',
+                        help="Importa le sessioni pickle del vecchio formato trovate nella cartella "
+                             "di output (solo se affidabili: il pickle può eseguire codice)")
+    parser.add_argument('--quota-file', default=QUOTA_FILE,
+                        help=f"Registro del consumo di quota giornaliero (default: {QUOTA_FILE})")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('youtube_analyzer.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+    api_keys = args.api_keys or read_api_keys(args.config)
+    if not api_keys:
+        parser.error("Nessuna API key: usa --api-key o configura le keys dalla GUI")
+
+    channel_urls = read_channel_urls(args.channels_file)
+    video_cache = None if args.no_cache else VideoCache(args.cache)
+    try:
+        results = run_batch(channel_urls, api_keys, args.strategy, args.output_dir,
+                            pipelined=not args.no_pipeline, video_cache=video_cache,
+                            quota=QuotaLedger(args.quota_file), quota_budget=args.quota_budget,
+                            allow_legacy=args.allow_legacy_sessions)
+    finally:
+        if video_cache is not None:
+            video_cache.close()
+
+    failed = [r for r in results if 'error' in r]
+    logging.info(f"Batch completato: {len(results) - len(failed)}/{len(results)} canali caricati")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Journal dei checkpoint di caricamento, sicuro in caso di crash.
+
+Ogni fase di un caricamento (playlist, finestre di date e ordinamenti della
+search) registra su disco, una riga JSON per evento, gli ID trovati in ogni
+pagina, il token della prossima pagina, le suddivisioni delle finestre e le
+sorgenti completate (un file ``jsonl_log``); i video idratati sono nel journal
+dei video (``record_journal``). Gli ID trovati ma assenti dal journal dei video
+vengono idratati alla ripresa (1 unità ogni 50), senza rifare le pagine di
+search.
+
+Se il caricamento si interrompe (crash, quota o budget esauriti) quello
+successivo dello stesso canale e strategia riparte dal journal saltando il
+lavoro finito; un caricamento concluso lo cancella.
+"""
+import logging
+import os
+import threading
+
+from jsonl_log import JsonlWriter, read_entries, remove_file
+
+CHECKPOINT_DIR = 'youtube_analyzer_checkpoints'
+
+
+def checkpoint_path(directory, channel_id, strategy):
+    """File del journal per un canale e una strategia"""
+    return os.path.join(directory, f"{channel_id}.{strategy}.jsonl")
+
+
+class CheckpointJournal:
+    """Journal append-only dei progressi di un caricamento, riletto all'apertura"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.tokens = {}  # sorgente -> (token della prossima pagina, avanzamento: pagine o risultati)
+        self.splits = {}  # finestra -> sotto-finestre in cui è stata divisa
+        self.done = set()  # sorgenti completate
+        self.found = set()  # ID trovati nelle pagine già lette
+        self._replay()
+        self._file = JsonlWriter(path)
+
+    def _replay(self):
+        """Rilegge il journal esistente"""
+        if not os.path.exists(self.path):
+            return
+        for entry in read_entries(self.path):
+            kind, source = entry.get('t'), entry.get('source')
+            if kind == 'page':
+                self.tokens[source] = (entry['token'], entry['progress'])
+            elif kind == 'split':
+                self.splits[source] = [tuple(window) for window in entry['windows']]
+            elif kind == 'done':
+                self.done.add(source)
+                self.tokens.pop(source, None)
+            elif kind == 'found':
+                self.found.update(entry['ids'])
+        logging.info(f"Checkpoint {self.path}: {len(self.done)} sorgenti completate, "
+                     f"{len(self.tokens)} in corso, {len(self.found):,} video trovati")
+
+    @property
+    def resumable(self):
+        """True se il journal contiene lavoro di un caricamento precedente"""
+        return bool(self.tokens or self.splits or self.done or self.found)
+
+    def _append(self, entry):
+        self._file.append(entry)
+
+    def record_found(self, video_ids):
+        """Registra gli ID trovati in una pagina, prima del token che la segue"""
+        with self._lock:
+            new_ids = [vid for vid in video_ids if vid not in self.found]
+            if new_ids:
+                self.found.update(new_ids)
+                self._append({'t': 'found', 'ids': new_ids})
+
+    def page(self, source, token, progress):
+        """Registra il token della prossima pagina di una sorgente e il suo avanzamento"""
+        with self._lock:
+            self.tokens[source] = (token, progress)
+            self._append({'t': 'page', 'source': source, 'token': token, 'progress': progress})
+
+    def split(self, source, windows):
+        """Registra la suddivisione di una finestra (lista di coppie di stringhe)"""
+        with self._lock:
+            self.splits[source] = [tuple(window) for window in windows]
+            self._append({'t': 'split', 'source': source, 'windows': windows})
+
+    def finish(self, source):
+        """Registra una sorgente come completata"""
+        with self._lock:
+            self.done.add(source)
+            self.tokens.pop(source, None)
+            self._append({'t': 'done', 'source': source})
+
+    def video_ids(self):
+        """Tutti gli ID trovati nelle pagine già lette"""
+        with self._lock:
+            return set(self.found)
+
+    def resume_point(self, source):
+        """(token, avanzamento) da cui riprendere una sorgente, (None, 0) se da capo"""
+        with self._lock:
+            return self.tokens.get(source, (None, 0))
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def discard(self):
+        """Chiude e cancella il journal (caricamento concluso)"""
+        self.close()
+        remove_file(self.path, 'checkpoint')
@@ -0,0 +1,89 @@
+"""Export in streaming dei video in CSV o NDJSON.
+
+Le righe vengono formattate e scritte a blocchi direttamente dai VideoRecord,
+senza costruire in memoria l'intera tabella; si serializzano solo le colonne
+scelte. Il file viene scritto accanto e rinominato alla fine, così un export
+interrotto non lascia un file a metà.
+"""
+import csv
+import json
+import os
+from itertools import islice
+
+CHUNK_SIZE = 5000  # Righe scritte (e avanzamento notificato) per blocco
+
+# Colonne esportabili: chiave NDJSON -> (intestazione CSV, valore dal VideoRecord)
+EXPORT_COLUMNS = {
+    'title': ('Titolo', lambda v: v.title),
+    'url': ('URL', lambda v: v.url),
+    'date': ('Data', lambda v: v.published_at[:10]),
+    'duration': ('Durata', lambda v: v.duration),
+    'views': ('Views', lambda v: v.views),
+    'likes': ('Like', lambda v: v.likes),
+    'comments': ('Commenti', lambda v: v.comments),
+    'video_id': ('ID Video', lambda v: v.video_id),
+    'published_at': ('Pubblicato', lambda v: v.published_at),
+    'duration_seconds': ('Durata (s)', lambda v: v.duration_seconds),
+}
+DEFAULT_COLUMNS = ('title', 'url', 'date', 'duration', 'views', 'likes', 'comments')
+
+FORMATS = ('csv', 'ndjson')
+
+
+def export_format(filename):
+    """Formato di export dedotto dall'estensione del file (default CSV)"""
+    return 'ndjson' if filename.lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+
+
+def _chunks(videos, size):
+    iterator = iter(videos)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_videos(videos, filename, fmt=None, columns=DEFAULT_COLUMNS, chunk_size=CHUNK_SIZE,
+                  on_progress=None):
+    """Scrive ``videos`` (sequenza di VideoRecord) e restituisce il numero di righe esportate
+
+    ``columns`` sono chiavi di EXPORT_COLUMNS nell'ordine di output;
+    ``on_progress(esportati, totale)`` viene chiamata dopo ogni blocco.
+    """
+    fmt = fmt or export_format(filename)
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato di export non supportato: {fmt}")
+    unknown = [name for name in columns if name not in EXPORT_COLUMNS]
+    if unknown or not columns:
+        raise ValueError(f"Colonne di export non valide: {', '.join(unknown) or 'nessuna'}")
+
+    getters = [EXPORT_COLUMNS[name][1] for name in columns]
+    total = len(videos)
+    done = 0
+    tmp_filename = filename + '.tmp'
+    try:
+        if fmt == 'csv':
+            # utf-8-sig: Excel riconosce la codifica dal BOM
+            with open(tmp_filename, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow([EXPORT_COLUMNS[name][0] for name in columns])
+                for chunk in _chunks(videos, chunk_size):
+                    writer.writerows([get(v) for get in getters] for v in chunk)
+                    done += len(chunk)
+                    if on_progress:
+                        on_progress(done, total)
+        else:
+            with open(tmp_filename, 'w', encoding='utf-8', newline='\n') as f:
+                for chunk in _chunks(videos, chunk_size):
+                    f.write(''.join(json.dumps(dict(zip(columns, [get(v) for get in getters])),
+                                               ensure_ascii=False) + '\n' for v in chunk))
+                    done += len(chunk)
+                    if on_progress:
+                        on_progress(done, total)
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+    return done
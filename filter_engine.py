@@ -0,0 +1,103 @@
+"""Filtri vettoriali sui video caricati.
+
+I campi numerici dei video sono tenuti in colonne NumPy allineate alla lista
+dei video; i filtri diventano maschere booleane combinate e il risultato è un
+array di indici nella lista originale.
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+
+def _epoch(day):
+    """Secondi epoch UTC della mezzanotte di ``day``"""
+    return int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp())
+
+
+class VideoColumns:
+    """Colonne NumPy (views, like, durata, data in epoch) di una lista di VideoRecord
+
+    Le permutazioni di ordinamento per colonna sono calcolate al primo uso e
+    poi aggiornate per fusione quando arrivano nuovi video in coda o in testa.
+    """
+
+    SORTABLE = ('views', 'likes', 'duration_seconds', 'published')
+
+    def __init__(self, videos):
+        self.count = len(videos)
+        self._records = list(videos)  # Copia superficiale: rileva riordinamenti sul posto
+        self.views = np.fromiter((v.views for v in videos), dtype=np.int64, count=self.count)
+        self.likes = np.fromiter((v.likes for v in videos), dtype=np.int64, count=self.count)
+        self.duration_seconds = np.fromiter((v.duration_seconds for v in videos), dtype=np.int64,
+                                            count=self.count)
+        # 'AAAA-MM-GGTHH:MM:SS' viene interpretato direttamente da NumPy
+        self.published = np.array([v.published_at[:19] for v in videos],
+                                  dtype='datetime64[s]').astype(np.int64)
+        self._orders = {}  # colonna -> argsort stabile crescente
+
+    def update(self, videos):
+        """Allinea le colonne a ``videos`` se sono stati solo aggiunti video in coda o in testa
+
+        Restituisce False se la lista è cambiata in altro modo e va ricostruita.
+        """
+        added = len(videos) - self.count
+        if added < 0:
+            return False
+        if videos[:self.count] == self._records:
+            if added:
+                self._merge(VideoColumns(videos[self.count:]), at_front=False)
+            return True
+        if videos[added:] == self._records:
+            self._merge(VideoColumns(videos[:added]), at_front=True)
+            return True
+        return False
+
+    def _merge(self, other, at_front):
+        """Unisce le colonne di ``other`` (video aggiunti) mantenendo le permutazioni ordinate"""
+        shift = other.count if at_front else 0
+        offset = 0 if at_front else self.count
+        for column, order in self._orders.items():
+            values = getattr(self, column)
+            other_values = getattr(other, column)
+            other_order = other.order(column)
+            # A parità di valore l'ordine stabile segue la posizione nella lista
+            slots = np.searchsorted(values[order], other_values[other_order],
+                                    side='left' if at_front else 'right')
+            self._orders[column] = np.insert(order + shift, slots, other_order + offset)
+        for column in self.SORTABLE:
+            parts = (getattr(other, column), getattr(self, column))
+            setattr(self, column, np.concatenate(parts if at_front else parts[::-1]))
+        self._records = other._records + self._records if at_front else self._records + other._records
+        self.count += other.count
+
+    def order(self, column):
+        """Permutazione che ordina la colonna in modo crescente (stabile)"""
+        order = self._orders.get(column)
+        if order is None:
+            order = self._orders[column] = np.argsort(getattr(self, column), kind='stable')
+        return order
+
+    def sorted_indices(self, indices, column, descending=False):
+        """Indici ordinati per colonna: selezione mascherata della permutazione già ordinata"""
+        order = self.order(column)
+        if len(indices) != self.count:
+            mask = np.zeros(self.count, dtype=bool)
+            mask[indices] = True
+            order = order[mask[order]]
+        return order[::-1] if descending else order
+
+    def select(self, min_views=None, min_duration=None, max_duration=None, start_date=None, end_date=None):
+        """Indici dei video che soddisfano tutti i filtri (None = filtro non attivo)"""
+        mask = np.ones(self.count, dtype=bool)
+        if min_views is not None:
+            mask &= self.views >= min_views
+        if min_duration is not None:
+            mask &= self.duration_seconds >= min_duration
+        if max_duration is not None:
+            mask &= self.duration_seconds <= max_duration
+        if start_date is not None:
+            mask &= self.published >= _epoch(start_date)
+        if end_date is not None:
+            # Data finale inclusa: fino alla mezzanotte del giorno successivo
+            mask &= self.published < _epoch(end_date + timedelta(days=1))
+        return np.flatnonzero(mask)
@@ -0,0 +1,159 @@
+"""Cache HTTP con ETag per le GET della YouTube Data API.
+
+Le risposte di channels e playlistItems vengono salvate con il loro ETag; le
+richieste successive inviano ``If-None-Match`` e un ``304`` viene servito dalla
+copia locale. L'oggetto già decodificato resta in memoria, così una risposta
+invariata non viene nemmeno ri-analizzata come JSON. Le pagine di videos non
+vengono salvate: views e like cambiano di continuo e non tornano quasi mai 304.
+
+In memoria (oggetti decodificati e, senza store, corpi) la cache è limitata
+in byte dei corpi JSON, con eviction LRU.
+"""
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import httplib2
+from googleapiclient.model import JsonModel
+
+CACHED_PATHS = re.compile(r'/youtube/v3/(channels|playlistItems)$')
+CACHE_KEY_HEADER = 'x-etag-cache-key'  # Segna le risposte che hanno una copia in cache
+MAX_PARSED_BYTES = 16 * 1024 * 1024  # Corpi (in byte) delle risposte tenute decodificate in memoria
+MAX_MEMORY_BYTES = 16 * 1024 * 1024  # Corpi tenuti in memoria quando non c'è uno store su disco
+
+
+def cache_key(uri):
+    """Chiave di una risposta: percorso e parametri ordinati, senza API key"""
+    parts = urlsplit(uri)
+    query = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if name != 'key')
+    return f"{parts.path}?{urlencode(query)}"
+
+
+class ETagCache:
+    """Archivio thread-safe di ETag e corpi delle risposte
+
+    Con ``store`` (una VideoCache) i corpi restano su disco tra una sessione e
+    l'altra; senza, vivono solo in memoria fino a ``max_memory`` byte.
+    """
+
+    def __init__(self, store=None, max_parsed=MAX_PARSED_BYTES, max_memory=MAX_MEMORY_BYTES):
+        self.store = store
+        self.max_parsed = max_parsed
+        self.max_memory = max_memory
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # chiave -> (etag, corpo), LRU usato solo senza store
+        self._entries_bytes = 0
+        self._parsed = OrderedDict()  # chiave -> (etag, oggetto decodificato, byte del corpo), LRU
+        self._parsed_bytes = 0
+        self.hits = 0  # Risposte 304 servite dalla cache
+        self.parse_skipped = 0  # Di cui senza decodificare il JSON
+
+    def get(self, key):
+        """(etag, corpo) salvati per la chiave, oppure None"""
+        if self.store is not None:
+            return self.store.get_response(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, etag, body):
+        if self.store is not None:
+            self.store.put_response(key, etag, body)
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._entries_bytes -= len(old[1])
+            self._entries[key] = (etag, body)
+            self._entries_bytes += len(body)
+            while self._entries_bytes > self.max_memory and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._entries_bytes -= len(evicted)
+
+    def parsed(self, key, etag):
+        """Oggetto già decodificato per la chiave, se corrisponde all'ETag"""
+        with self._lock:
+            entry = self._parsed.get(key)
+            if entry is None or entry[0] != etag:
+                return None
+            self._parsed.move_to_end(key)
+            self.parse_skipped += 1
+            return entry[1]
+
+    def remember(self, key, etag, result, size):
+        """Tiene in memoria l'oggetto decodificato; ``size`` è la lunghezza del corpo JSON"""
+        with self._lock:
+            old = self._parsed.pop(key, None)
+            if old is not None:
+                self._parsed_bytes -= old[2]
+            self._parsed[key] = (etag, result, size)
+            self._parsed_bytes += size
+            while self._parsed_bytes > self.max_parsed and self._parsed:
+                _, (_, _, evicted) = self._parsed.popitem(last=False)
+                self._parsed_bytes -= evicted
+
+    def count_hit(self):
+        with self._lock:
+            self.hits += 1
+
+
+class ETagHttp:
+    """Avvolge un ``httplib2.Http``: invia If-None-Match e trasforma i 304 in 200 dalla cache"""
+
+    def __init__(self, http, cache):
+        self.http = http
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.http, name)
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        if method != 'GET' or not CACHED_PATHS.search(urlsplit(uri).path):
+            return self.http.request(uri, method, body=body, headers=headers, **kwargs)
+
+        key = cache_key(uri)
+        cached = self.cache.get(key)
+        headers = dict(headers or {})
+        if cached is not None:
+            headers['if-none-match'] = cached[0]
+
+        resp, content = self.http.request(uri, method, body=body, headers=headers, **kwargs)
+        if resp.status == 304 and cached is not None:
+            self.cache.count_hit()
+            resp = httplib2.Response({
+                'status': '200',
+                'etag': cached[0],
+                'content-type': 'application/json; charset=UTF-8',
+                CACHE_KEY_HEADER: key
+            })
+            return resp, cached[1]
+        if resp.status == 200 and resp.get('etag'):
+            self.cache.put(key, resp['etag'], content)
+            resp[CACHE_KEY_HEADER] = key
+        return resp, content
+
+
+class CachedJsonModel(JsonModel):
+    """JsonModel che riusa l'oggetto decodificato delle risposte con ETag invariato
+
+    Le risposte riusate sono condivise: vanno trattate in sola lettura.
+    """
+
+    def __init__(self, cache):
+        super().__init__(data_wrapper=False)
+        self.cache = cache
+
+    def response(self, resp, content):
+        key = resp.get(CACHE_KEY_HEADER)
+        if key is None:
+            return super().response(resp, content)
+        etag = resp.get('etag')
+        result = self.cache.parsed(key, etag)
+        if result is None:
+            result = super().response(resp, content)
+            self.cache.remember(key, etag, result, len(content))
+        return result
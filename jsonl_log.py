@@ -0,0 +1,69 @@
+"""File JSONL append-only resistenti ai crash, condivisi dai journal su disco.
+
+Ogni voce è una riga JSON scritta con fsync: un crash perde al massimo la riga
+in scrittura. In lettura le righe troncate vengono saltate; riaprendo in
+append un file con l'ultima riga troncata si va a capo prima di scrivere.
+"""
+import json
+import logging
+import os
+
+
+class JsonlWriter:
+    """Scrittore append-only di un file JSONL (non thread-safe: il lock è del chiamante)
+
+    Con ``resume=False`` un file esistente viene sostituito da uno nuovo.
+    """
+
+    def __init__(self, path, resume=True):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.fresh = not resume or not os.path.exists(path)
+        torn = not self.fresh and _is_torn(path)
+        self._file = open(path, 'w' if self.fresh else 'a', encoding='utf-8')
+        if torn:
+            self._file.write('\n')  # La prossima riga non deve attaccarsi a quella troncata
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def append(self, entry):
+        """Scrive una voce come riga JSON e la porta su disco"""
+        self._file.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def _is_torn(path):
+    """True se il file non termina con un a capo (ultima riga scritta a metà)"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        if not f.tell():
+            return False
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b'\n'
+
+
+def read_entries(path):
+    """Generatore delle voci del file, saltando le righe scritte a metà da un crash"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def remove_file(path, label):
+    """Cancella un file JSONL, se esiste; ``label`` descrive il file nei log"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logging.warning(f"Impossibile cancellare il {label} {path}: {e}")
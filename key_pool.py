@@ -0,0 +1,81 @@
+"""Pool delle API key usate in parallelo.
+
+Ogni key ha il proprio ritmo (token bucket) e i worker scelgono la key sana
+meno impegnata, così con più key il throughput cresce invece di restare
+quello di una key sola. I contatori di quota e lo stato di esaurimento
+stanno nel QuotaLedger: una key esaurita resta in pausa fino all'azzeramento
+giornaliero mentre le altre continuano a servire i worker.
+"""
+import logging
+import threading
+from collections import defaultdict
+
+from throttle import TokenBucket
+
+
+class KeyPool:
+    """Key sane distribuite tra i worker, con un token bucket per key"""
+
+    def __init__(self, keys, quota, rate, capacity=1):
+        self.quota = quota
+        self.rate = rate
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._buckets = {}  # key -> TokenBucket
+        self._in_flight = defaultdict(int)  # key -> chiamate in corso
+        self.keys = []
+        self.set_keys(keys)
+
+    def set_keys(self, keys):
+        """Aggiorna l'elenco delle key mantenendo lo stato di quelle già note"""
+        with self._lock:
+            self.keys = list(keys)
+            for key in self.keys:
+                if key not in self._buckets:
+                    self._buckets[key] = TokenBucket(self.rate, capacity=self.capacity)
+
+    def is_healthy(self, index):
+        return 0 <= index < len(self.keys) and not self.quota.is_exhausted(self.keys[index])
+
+    def next_healthy(self, after):
+        """Prima key sana dopo ``after`` (in ordine circolare), oppure None"""
+        count = len(self.keys)
+        for step in range(1, count + 1):
+            index = (after + step) % count
+            if self.is_healthy(index):
+                return index
+        return None
+
+    def wait(self, index):
+        """Attende il turno di una chiamata con la key indicata"""
+        if 0 <= index < len(self.keys):
+            self._buckets[self.keys[index]].acquire()
+
+    def acquire(self):
+        """Sceglie la key sana meno impegnata, ne attende il turno e la segna in uso
+
+        Restituisce l'indice della key, oppure None se sono tutte esaurite.
+        Va sempre seguita da ``release``.
+        """
+        with self._lock:
+            candidates = [(self._in_flight[key], self.quota.used_today(key), index)
+                          for index, key in enumerate(self.keys) if not self.quota.is_exhausted(key)]
+            if not candidates:
+                return None
+            index = min(candidates)[2]
+            key = self.keys[index]
+            self._in_flight[key] += 1
+        self._buckets[key].acquire()
+        return index
+
+    def release(self, index):
+        with self._lock:
+            self._in_flight[self.keys[index]] -= 1
+
+    def mark_exhausted(self, index):
+        """Mette in pausa una key fino al prossimo azzeramento della quota"""
+        key = self.keys[index]
+        if not self.quota.is_exhausted(key):
+            self.quota.mark_exhausted(key)
+            logging.warning(f"Key {index + 1} in pausa fino all'azzeramento della quota "
+                            f"({self.quota.reset_at.astimezone():%Y-%m-%d %H:%M})")
@@ -0,0 +1,103 @@
+"""Pipeline producer/consumer per l'idratazione dei dettagli video.
+
+L'enumerazione delle pagine (playlist o search) produce batch di ID che
+vengono messi in una coda limitata; un gruppo di worker esegue le chiamate
+``videos().list`` e passa gli item a un unico stadio sink che li normalizza.
+Così elenco e idratazione si sovrappongono invece di sommare le latenze.
+
+Con ``group_size > 1`` un worker prende insieme i batch già in coda (fino a
+``group_size``), così ``fetch`` può spedirli in un'unica richiesta HTTP.
+"""
+import logging
+import queue
+import threading
+
+
+class DetailPipeline:
+    """Coda batch di ID → worker ``fetch`` → thread ``sink``
+
+    ``fetch(jobs, quota_exhausted=...)`` riceve una lista di ``(batch_ids, args)``
+    (al massimo ``group_size``) e restituisce la lista di item grezzi;
+    ``sink(items)`` viene chiamato sempre dallo stesso thread, quindi può
+    modificare liste e cache senza lock.
+    """
+
+    def __init__(self, fetch, sink, workers=4, max_pending=None, group_size=1):
+        self._fetch = fetch
+        self._sink = sink
+        self.group_size = group_size
+        # Coda limitata: se i worker sono indietro, il produttore si blocca
+        self._batches = queue.Queue(maxsize=max_pending or workers * max(group_size, 2))
+        self._results = queue.Queue()
+        self.quota_exhausted = threading.Event()
+
+        self._workers = [threading.Thread(target=self._work, name=f'video-details-{i}', daemon=True)
+                         for i in range(workers)]
+        self._sink_thread = threading.Thread(target=self._drain, name='video-sink', daemon=True)
+        for thread in self._workers + [self._sink_thread]:
+            thread.start()
+
+    def submit(self, batch_ids, *args):
+        """Accoda un batch di ID (max 50) con argomenti extra per ``fetch``; blocca se la coda è piena"""
+        self._batches.put((batch_ids, args))
+
+    def join(self):
+        """Attende che tutti i batch accodati siano stati idratati e normalizzati"""
+        self._batches.join()
+        self._results.join()
+
+    def close(self):
+        """Completa il lavoro pendente e termina i thread"""
+        self.join()
+        for _ in self._workers:
+            self._batches.put(None)
+        for thread in self._workers:
+            thread.join()
+        self._results.put(None)
+        self._sink_thread.join()
+
+    def _take_group(self):
+        """Primo batch in coda (bloccante) più quelli già pronti, fino a ``group_size``
+
+        Restituisce (batch, stop): ``stop`` indica che è arrivato il segnale di chiusura.
+        """
+        job = self._batches.get()
+        if job is None:
+            return [], True
+        jobs = [job]
+        while len(jobs) < self.group_size:
+            try:
+                job = self._batches.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                return jobs, True
+            jobs.append(job)
+        return jobs, False
+
+    def _work(self):
+        while True:
+            jobs, stop = self._take_group()
+            try:
+                # Con quota esaurita i batch rimanenti vengono scartati
+                if jobs and not self.quota_exhausted.is_set():
+                    self._results.put(self._fetch(jobs, quota_exhausted=self.quota_exhausted))
+            except Exception as e:
+                logging.error(f"Errore worker dettagli video: {e}")
+            finally:
+                for _ in range(len(jobs) + stop):
+                    self._batches.task_done()
+            if stop:
+                return
+
+    def _drain(self):
+        while True:
+            items = self._results.get()
+            try:
+                if items is None:
+                    return
+                self._sink(items)
+            except Exception as e:
+                logging.error(f"Errore sink dettagli video: {e}")
+            finally:
+                self._results.task_done()
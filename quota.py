@@ -0,0 +1,180 @@
+"""Contabilità della quota YouTube Data API in unità.
+
+Ogni endpoint ha un costo in unità (search.list = 100, quasi tutto il resto
+= 1); il registro tiene le unità usate per endpoint e per API key nella
+giornata di quota corrente, che si azzera alla mezzanotte del Pacifico.
+Le key sono identificate da un hash breve: il file del registro non contiene
+le API key.
+"""
+import hashlib
+import json
+import re
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, time as dtime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+    ZoneInfoNotFoundError = Exception
+
+QUOTA_FILE = 'youtube_analyzer_quota.json'
+
+DAILY_QUOTA = 10000  # Unità giornaliere di default per progetto/key
+DEFAULT_COST = 1
+QUOTA_COSTS = {
+    'search.list': 100,
+    'channels.list': 1,
+    'playlistItems.list': 1,
+    'videos.list': 1
+}
+
+
+_KEY_ID_RE = re.compile(r'^[0-9a-f]{12}$')
+
+
+def key_id(key):
+    """Identificativo di una API key nel registro: hash breve, mai la key in chiaro"""
+    if not key or _KEY_ID_RE.match(key):
+        return key
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:12]
+
+
+class QuotaBudgetExceeded(Exception):
+    """Il caricamento ha raggiunto il budget di unità impostato dall'utente"""
+
+
+class QuotaExhausted(QuotaBudgetExceeded):
+    """Tutte le API key hanno esaurito la quota: il caricamento si interrompe come col budget"""
+
+
+def quota_cost(endpoint):
+    """Costo in unità di una chiamata all'endpoint"""
+    return QUOTA_COSTS.get(endpoint, DEFAULT_COST)
+
+
+def _pacific_tz():
+    if ZoneInfo is not None:
+        try:
+            return ZoneInfo('America/Los_Angeles')
+        except ZoneInfoNotFoundError:
+            pass
+    # Senza database dei fusi (es. Windows senza tzdata) si ignora l'ora legale
+    return timezone(timedelta(hours=-8))
+
+
+def next_quota_reset(now=None):
+    """Prossimo azzeramento della quota (mezzanotte ora del Pacifico), in UTC"""
+    tz = _pacific_tz()
+    local_now = (now or datetime.now(timezone.utc)).astimezone(tz)
+    midnight = datetime.combine(local_now.date() + timedelta(days=1), dtime(0), tzinfo=tz)
+    return midnight.astimezone(timezone.utc)
+
+
+class QuotaLedger:
+    """Registro thread-safe delle unità di quota consumate nella giornata corrente
+
+    Con ``path`` il registro viene letto all'avvio e salvato con ``save()``,
+    così GUI e batch condividono il consumo della giornata.
+    """
+
+    def __init__(self, path=None, daily_quota=DAILY_QUOTA):
+        self.path = path
+        self.daily_quota = daily_quota
+        self._lock = threading.Lock()
+        self.total_units = 0  # Unità dall'avvio del processo (non si azzera)
+        self._start_day(next_quota_reset())
+        if path and os.path.exists(path):
+            self._load()
+
+    def _start_day(self, reset_at):
+        self.reset_at = reset_at
+        self.units_by_endpoint = defaultdict(int)
+        self.calls_by_endpoint = defaultdict(int)
+        self.units_by_key = defaultdict(int)
+        self.exhausted_keys = set()  # Key che hanno ricevuto un errore di quota esaurita
+
+    def _roll_over(self):
+        now = datetime.now(timezone.utc)
+        if now >= self.reset_at:
+            self._start_day(next_quota_reset(now))
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            reset_at = datetime.fromisoformat(data['reset_at'])
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Registro quota non leggibile ({self.path}): {e}")
+            return
+        if datetime.now(timezone.utc) >= reset_at:
+            return  # Giornata di quota già finita
+        self.reset_at = reset_at
+        self.units_by_endpoint.update(data.get('units_by_endpoint', {}))
+        self.calls_by_endpoint.update(data.get('calls_by_endpoint', {}))
+        # I registri di versioni precedenti hanno le key in chiaro: vengono convertite
+        for key, units in data.get('units_by_key', {}).items():
+            self.units_by_key[key_id(key)] += units
+        self.exhausted_keys.update(key_id(key) for key in data.get('exhausted_keys', []))
+
+    def save(self):
+        """Salva il consumo della giornata (se il registro ha un file)"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                'reset_at': self.reset_at.isoformat(),
+                'units_by_endpoint': dict(self.units_by_endpoint),
+                'calls_by_endpoint': dict(self.calls_by_endpoint),
+                'units_by_key': dict(self.units_by_key),
+                'exhausted_keys': sorted(self.exhausted_keys)
+            }
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            logging.warning(f"Impossibile salvare il registro quota: {e}")
+
+    def record(self, endpoint, key=''):
+        """Registra una chiamata e ne restituisce il costo in unità"""
+        cost = quota_cost(endpoint)
+        with self._lock:
+            self._roll_over()
+            self.units_by_endpoint[endpoint] += cost
+            self.calls_by_endpoint[endpoint] += 1
+            self.units_by_key[key_id(key)] += cost
+            self.total_units += cost
+        return cost
+
+    def used_today(self, key=None):
+        """Unità usate oggi, da una key o in totale"""
+        with self._lock:
+            self._roll_over()
+            if key is None:
+                return sum(self.units_by_key.values())
+            return self.units_by_key.get(key_id(key), 0)
+
+    def remaining(self, keys):
+        """Unità ancora disponibili oggi sommando le key indicate"""
+        with self._lock:
+            self._roll_over()
+            return sum(max(self.daily_quota - self.units_by_key.get(key_id(key), 0), 0) for key in keys)
+
+    def mark_exhausted(self, key):
+        """Segna una key come esaurita fino al prossimo azzeramento"""
+        with self._lock:
+            self._roll_over()
+            self.exhausted_keys.add(key_id(key))
+
+    def is_exhausted(self, key):
+        """True se l'API ha segnalato la quota della key come esaurita nella giornata corrente
+
+        Il conteggio delle unità non basta: la quota reale del progetto può
+        essere diversa da ``daily_quota``.
+        """
+        with self._lock:
+            self._roll_over()
+            return key_id(key) in self.exhausted_keys
@@ -0,0 +1,114 @@
+"""Journal append-only dei video idratati durante un caricamento.
+
+Ogni batch di video aggiunto ai caricati viene scritto su disco come una riga
+JSON (i campi di ogni video nell'ordine di ``COLUMNS`` della sessione) di un
+file ``jsonl_log``: un crash perde al massimo il batch in scrittura. Il journal
+non tiene nulla in memoria e viene letto in streaming, riga per riga.
+
+``compact_journal`` lo trasforma in un file di sessione colonnare; i video
+scritti più volte (es. statistiche aggiornate) tengono l'ultima versione.
+"""
+import logging
+import os
+import threading
+from array import array
+from datetime import datetime
+
+from jsonl_log import JsonlWriter, read_entries, remove_file
+from session_store import COLUMNS, write_session_columns
+
+FIELDS = tuple(name for name, _ in COLUMNS)
+
+
+def records_path(directory, channel_id, strategy):
+    """File del journal dei video per un canale e una strategia"""
+    return os.path.join(directory, f"{channel_id}.{strategy}.records.jsonl")
+
+
+class RecordJournal:
+    """Scrittore thread-safe del journal: una riga per batch, scritta con fsync
+
+    Con ``resume=False`` un journal esistente viene sostituito da uno nuovo.
+    """
+
+    def __init__(self, path, channel_data=None, resume=False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = JsonlWriter(path, resume=resume)
+        if self._file.fresh:
+            self._file.append({'t': 'meta', 'channel_data': channel_data, 'fields': FIELDS})
+
+    def append(self, records):
+        """Scrive un batch di VideoRecord"""
+        if not records:
+            return
+        rows = [[getattr(record, name) for name in FIELDS] for record in records]
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.append({'t': 'rec', 'rows': rows})
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def discard(self):
+        """Chiude e cancella il journal (video ormai salvati in una sessione)"""
+        self.close()
+        discard_journal(self.path)
+
+
+def discard_journal(path):
+    """Cancella un journal dei video, se esiste"""
+    remove_file(path, 'journal')
+
+
+def read_journal(path):
+    """Legge il journal in streaming: restituisce (channel_data, generatore di dict con i campi)"""
+    entries = read_entries(path)
+    header = next(entries, None)
+    if not header or header.get('t') != 'meta':
+        entries.close()
+        raise ValueError(f"Journal dei video non valido: {path}")
+
+    def rows():
+        for entry in entries:
+            for row in entry.get('rows', ()):
+                yield dict(zip(FIELDS, row))
+
+    return header.get('channel_data'), rows()
+
+
+def compact_journal(path, session_filename, channel_url=None, meta=None):
+    """Scrive il journal come sessione colonnare e restituisce il numero di video
+
+    Le colonne vengono riempite riga per riga (interi in array compatti), senza
+    tenere in memoria un dict per video. ``meta`` sostituisce i metadati di
+    default della sessione.
+    """
+    channel_data, rows = read_journal(path)
+    values = {name: ([] if kind == 'str' else array(kind)) for name, kind in COLUMNS}
+    positions = {}  # video_id -> indice nelle colonne
+    for row in rows:
+        index = positions.get(row['video_id'])
+        if index is None:
+            positions[row['video_id']] = len(values['video_id'])
+            for name in FIELDS:
+                values[name].append(row[name])
+        else:
+            for name in FIELDS:
+                values[name][index] = row[name]
+
+    if channel_url is None and channel_data:
+        channel_url = f"https://www.youtube.com/channel/{channel_data['id']}"
+    meta = {
+        'channel_url': channel_url or '',
+        'channel_data': channel_data,
+        'api_calls_count': 0,
+        'debug_info': {},
+        'timestamp': datetime.now().isoformat(),
+        **(meta or {})
+    }
+    write_session_columns(session_filename, meta, values)
+    logging.info(f"Journal {path} compattato in {session_filename}: {len(positions):,} video")
+    return len(positions)
@@ -0,0 +1,56 @@
+"""Rappresentazione compatta dei video caricati."""
+
+
+def format_duration(seconds):
+    """Formatta durata da secondi a stringa"""
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
+    secs = seconds % 60
+
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    else:
+        return f"{minutes}:{secs:02d}"
+
+
+class VideoRecord:
+    """Video con soli campi primitivi; URL, durata formattata e data sono calcolati al bisogno"""
+
+    __slots__ = ('video_id', 'title', 'published_at', 'duration_seconds', 'views', 'likes', 'comments')
+
+    def __init__(self, video_id, title, published_at, duration_seconds, views, likes, comments):
+        self.video_id = video_id
+        self.title = title
+        self.published_at = published_at  # ISO 8601, es. '2024-01-31T10:00:00Z'
+        self.duration_seconds = duration_seconds
+        self.views = views
+        self.likes = likes
+        self.comments = comments
+
+    @property
+    def url(self):
+        return f"https://www.youtube.com/watch?v={self.video_id}"
+
+    @property
+    def duration(self):
+        return format_duration(self.duration_seconds)
+
+    def fields(self):
+        """Campi primitivi come dict (cache persistente e sessioni)"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"VideoRecord({self.video_id!r}, {self.title!r})"
+
+
+class VideoStub:
+    """Video già scritto nel journal dei video: in memoria restano solo ID e data"""
+
+    __slots__ = ('video_id', 'published_at')
+
+    def __init__(self, video_id, published_at):
+        self.video_id = video_id
+        self.published_at = published_at
+
+    def __repr__(self):
+        return f"VideoStub({self.video_id!r})"
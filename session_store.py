@@ -0,0 +1,150 @@
+"""Formato sessione colonnare, compresso e versionato.
+
+Struttura del file::
+
+    MAGIC | versione (uint16) | lunghezza header (uint32) | header | colonne
+
+L'header (JSON compresso) contiene i metadati della sessione e la posizione
+di ogni colonna; ogni colonna è compressa separatamente, così la lettura
+dell'header è immediata e le colonne vengono decodificate solo quando servono
+(il file è mappato in memoria).
+"""
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import zlib
+from array import array
+
+MAGIC = b'YTASESS\0'
+SCHEMA_VERSION = 1
+_PREFIX = struct.Struct('<HI')
+
+# Colonne dei record video: nome -> tipo ('str' o typecode di array)
+COLUMNS = (
+    ('video_id', 'str'),
+    ('title', 'str'),
+    ('published_at', 'str'),
+    ('duration_seconds', 'q'),
+    ('views', 'q'),
+    ('likes', 'q'),
+    ('comments', 'q'),
+)
+
+_STR_SEPARATOR = '\0'  # Non compare in ID, titoli o date
+
+
+class LegacySessionError(ValueError):
+    """Il file è una sessione pickle del vecchio formato"""
+
+
+def _encode_column(values, kind):
+    if kind == 'str':
+        raw = _STR_SEPARATOR.join(values).encode('utf-8')
+    else:
+        raw = array(kind, values).tobytes()
+    return zlib.compress(raw, 6)
+
+
+def write_session(filename, meta, records):
+    """Scrive la sessione: ``meta`` è un dict JSON, ``records`` una lista di dict con i campi di COLUMNS"""
+    write_session_columns(filename, meta, {name: [r[name] for r in records] for name, _ in COLUMNS})
+
+
+def write_session_columns(filename, meta, values):
+    """Scrive la sessione da colonne già separate: ``values`` mappa ogni nome di COLUMNS a una sequenza"""
+    blobs = []
+    columns = {}
+    offset = 0
+    for name, kind in COLUMNS:
+        blob = _encode_column(values[name], kind)
+        columns[name] = [offset, len(blob), kind]
+        blobs.append(blob)
+        offset += len(blob)
+
+    header = zlib.compress(json.dumps({
+        'meta': meta,
+        'count': len(values[COLUMNS[0][0]]),
+        'byteorder': sys.byteorder,
+        'columns': columns
+    }).encode('utf-8'))
+
+    # Scrittura atomica: un salvataggio interrotto non corrompe la sessione precedente
+    tmp_filename = filename + '.tmp'
+    with open(tmp_filename, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_PREFIX.pack(SCHEMA_VERSION, len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_filename, filename)
+
+
+class SessionReader:
+    """Lettore lazy: l'header è letto subito, le colonne solo su richiesta"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = open(filename, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # File vuoto
+            self._file.close()
+            raise ValueError(f"Sessione vuota: {filename}")
+
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise LegacySessionError(f"Formato sessione non riconosciuto (pickle?): {filename}")
+
+        version, header_len = _PREFIX.unpack_from(self._mm, len(MAGIC))
+        if version > SCHEMA_VERSION:
+            self.close()
+            raise ValueError(f"Sessione creata da una versione più recente (schema {version})")
+
+        header_start = len(MAGIC) + _PREFIX.size
+        header = json.loads(zlib.decompress(self._mm[header_start:header_start + header_len]))
+        self.version = version
+        self.meta = header['meta']
+        self.count = header['count']
+        self._byteorder = header['byteorder']
+        self._columns = header['columns']
+        self._data_start = header_start + header_len
+
+    def column(self, name):
+        """Decodifica una colonna e la restituisce come lista"""
+        offset, length, kind = self._columns[name]
+        start = self._data_start + offset
+        raw = zlib.decompress(self._mm[start:start + length])
+        if kind == 'str':
+            return raw.decode('utf-8').split(_STR_SEPARATOR) if self.count else []
+        values = array(kind)
+        values.frombytes(raw)
+        if self._byteorder != sys.byteorder:
+            values.byteswap()
+        return values.tolist()
+
+    def records(self):
+        """Ricostruisce i record come dict di campi primitivi"""
+        names = [name for name, _ in COLUMNS]
+        columns = [self.column(name) for name in names]
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+    def close(self):
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_legacy_session(filename):
+    """Legge una sessione pickle del vecchio formato (solo da file affidabili)"""
+    with open(filename, 'rb') as f:
+        return pickle.load(f)
@@ -0,0 +1,61 @@
+"""Suddivisione adattiva delle finestre di date della search."""
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+from channel_loader import ChannelLoader
+from checkpoint import CheckpointJournal
+from records import VideoStub
+
+START, END = datetime(2023, 1, 1), datetime(2024, 1, 1)
+
+
+def packed_at_end(count=600):
+    """Video noti tutti nell'ultimo giorno della finestra (es. caricamento in blocco)"""
+    day = datetime(2023, 12, 31)
+    return [f"{day + timedelta(seconds=n * 60):%Y-%m-%dT%H:%M:%S}" for n in range(count)]
+
+
+class SplitWindowTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loader = ChannelLoader(['test-key'], checkpoint_dir=None)
+
+    def test_known_videos_packed_in_last_cell(self):
+        windows = self.loader._split_window(START, END, 2, 700, packed_at_end())
+        self.assertGreaterEqual(len(windows), 2)
+        self.assertEqual(windows[0][0], START)
+        self.assertEqual(windows[-1][1], END)
+        for (a, b), (c, _) in zip(windows, windows[1:]):
+            self.assertEqual(b, c)
+        for a, b in windows:
+            self.assertLess(a, b)
+            self.assertNotEqual((a, b), (START, END))
+
+    def test_search_by_range_terminates_with_checkpoints(self):
+        loader = self.loader
+        loader.videos = [VideoStub(f"v{n}", published) for n, published in enumerate(packed_at_end())]
+        calls = []
+
+        def search_page(youtube, channel_id, start, end, page_token=None):
+            calls.append((start, end))
+            return {'items': [], 'nextPageToken': 'next', 'pageInfo': {'totalResults': 700}}, youtube
+
+        loader._search_range_page = search_page
+        loader._collect_search_ids = lambda response, existing_ids: []
+        with tempfile.TemporaryDirectory() as directory:
+            loader.checkpoints = CheckpointJournal(os.path.join(directory, 'UC.complete.jsonl'))
+            thread = threading.Thread(target=loader._search_by_range,
+                                      args=(None, 'UC', START, END, set()), kwargs={'max_pages': 20},
+                                      daemon=True)
+            thread.start()
+            thread.join(timeout=10)
+            loader.checkpoints.close()
+        self.assertFalse(thread.is_alive(), "_search_by_range non termina")
+        self.assertLessEqual(len(calls), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
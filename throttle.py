@@ -0,0 +1,184 @@
+"""Controllo del ritmo delle chiamate API condiviso tra thread.
+
+Oltre al token bucket per key, le risposte vengono classificate (quota
+esaurita, rate limit, 403 generico, errore del server) e i segnali di
+sovraccarico regolano una finestra di concorrenza AIMD con backoff
+esponenziale con jitter.
+"""
+import json
+import logging
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket thread-safe: ``rate`` chiamate al secondo con burst fino a ``capacity``"""
+
+    def __init__(self, rate, capacity=1):
+        self._lock = threading.Lock()
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens=1):
+        """Blocca il thread chiamante finché non ci sono token disponibili"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Classi di errore della YouTube Data API
+QUOTA_EXCEEDED = 'quotaExceeded'  # Quota giornaliera della key esaurita
+RATE_LIMITED = 'rateLimitExceeded'  # Troppe richieste: rallentare e riprovare
+FORBIDDEN = 'forbidden'  # 403 non legato alla quota (video privato, API disattivata, ...)
+BACKEND_ERROR = 'backendError'  # 5xx o errore temporaneo del server
+OTHER_ERROR = 'other'
+
+_QUOTA_REASONS = {'quotaExceeded', 'dailyLimitExceeded'}
+_RATE_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+_BACKEND_REASONS = {'backendError', 'internalError'}
+OVERLOAD_ERRORS = (RATE_LIMITED, BACKEND_ERROR)  # Segnali di sovraccarico: si ritenta con backoff
+
+BACKOFF_BASE = 1.0  # Secondi
+BACKOFF_CAP = 32.0
+MAX_RETRIES = 5
+
+
+def error_reason(content):
+    """``reason`` del primo errore nel corpo JSON di una risposta di errore, oppure ''"""
+    try:
+        error = json.loads(content)['error']
+        errors = error.get('errors') or [{}]
+        return errors[0].get('reason', '') or error.get('status', '')
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return ''
+
+
+def classify_response(status, content):
+    """Classe di errore di una risposta HTTP (None se riuscita)"""
+    if status < 400:
+        return None
+    reason = error_reason(content)
+    if reason in _QUOTA_REASONS:
+        return QUOTA_EXCEEDED
+    if status == 429 or reason in _RATE_REASONS:
+        return RATE_LIMITED
+    if status >= 500 or reason in _BACKEND_REASONS:
+        return BACKEND_ERROR
+    if status == 403:
+        return FORBIDDEN
+    return OTHER_ERROR
+
+
+def classify_error(error):
+    """Classe di errore di un HttpError del client Google"""
+    return classify_response(error.resp.status, error.content)
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Attesa prima del tentativo ``attempt`` (da 0): esponenziale con jitter pieno"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class AdaptiveLimiter:
+    """Finestra di chiamate contemporanee regolata con AIMD
+
+    Ogni risposta riuscita allarga la finestra di ``1 / limite`` (circa una
+    chiamata in più per finestra completata); un segnale di sovraccarico la
+    moltiplica per ``decrease``. Come in TCP, contano solo i sovraccarichi di
+    richieste partite dopo l'ultima diminuzione: una raffica di errori della
+    stessa finestra vale un solo segnale.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=16, decrease=0.5):
+        self._cond = threading.Condition()
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.in_flight = 0
+        self.latency = 0.0  # Media mobile della durata delle richieste (secondi)
+        self._last_decrease = 0.0
+        self.overloads = 0  # Segnali di sovraccarico ricevuti
+        self.retries = 0  # Richieste ritentate dopo un backoff
+
+    def acquire(self):
+        """Blocca finché la finestra ha posto per un'altra chiamata; restituisce l'istante di partenza"""
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release(self, started, overloaded=False):
+        """Chiude una chiamata partita a ``started``: riuscita (aumento additivo) o sovraccarico"""
+        now = time.monotonic()
+        with self._cond:
+            self.in_flight -= 1
+            self.latency = 0.875 * self.latency + 0.125 * (now - started) if self.latency else now - started
+            if overloaded:
+                self.overloads += 1
+                if started >= self._last_decrease:
+                    self._decrease(now)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def signal_overload(self):
+        """Segnala un sovraccarico arrivato fuori da acquire/release (es. sotto-risposta di un batch)"""
+        now = time.monotonic()
+        with self._cond:
+            self.overloads += 1
+            if now - self._last_decrease >= self.latency:
+                self._decrease(now)
+
+    def count_retry(self):
+        with self._cond:
+            self.retries += 1
+
+    def _decrease(self, now):
+        self.limit = max(float(self.minimum), self.limit * self.decrease)
+        self._last_decrease = now
+
+
+class AdaptiveHttp:
+    """Avvolge un ``httplib2.Http``: ogni richiesta passa dalla finestra AIMD e
+    i sovraccarichi (rateLimitExceeded, 429, 5xx) vengono ritentati con backoff"""
+
+    def __init__(self, http, limiter, max_retries=MAX_RETRIES):
+        self.http = http
+        self.limiter = limiter
+        self.max_retries = max_retries
+
+    def __getattr__(self, name):
+        return getattr(self.http, name)
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        attempt = 0
+        while True:
+            started = self.limiter.acquire()
+            kind = None
+            try:
+                resp, content = self.http.request(uri, method, body=body, headers=headers, **kwargs)
+                kind = classify_response(resp.status, content)
+            finally:
+                self.limiter.release(started, overloaded=kind in OVERLOAD_ERRORS)
+            if kind not in OVERLOAD_ERRORS or attempt >= self.max_retries:
+                return resp, content
+            delay = backoff_delay(attempt)
+            logging.warning(f"{kind} (HTTP {resp.status}): nuovo tentativo tra {delay:.1f}s")
+            self.limiter.count_retry()
+            time.sleep(delay)
+            attempt += 1
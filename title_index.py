@@ -0,0 +1,161 @@
+"""Indice invertito sui titoli dei video.
+
+Ogni titolo viene normalizzato (casefold) una sola volta all'ingresso e diviso
+in token ``\\w+``; per ogni token si tiene la lista dei documenti che lo
+contengono. Una query compilata (``TitleQuery``) produce per ogni keyword un
+insieme di candidati dall'indice e solo i candidati vengono verificati con il
+matcher precompilato.
+"""
+import re
+import threading
+from array import array
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Token di ricerca di un testo già normalizzato con casefold"""
+    return _TOKEN_RE.findall(text)
+
+
+class KeywordMatcher:
+    """Keyword compilata: un solo test su titolo originale o normalizzato"""
+
+    def __init__(self, keyword, case_sensitive=False, whole_word=False):
+        self.keyword = keyword
+        self.folded = keyword.casefold()
+        self.tokens = tokenize(self.folded)
+        self.whole_word = whole_word
+        # I confronti senza distinzione di maiuscole usano i titoli normalizzati
+        self.use_folded = not case_sensitive
+        needle = keyword if case_sensitive else self.folded
+        if whole_word:
+            self.test = re.compile(r'\b' + re.escape(needle) + r'\b').search
+        else:
+            self.test = lambda text: needle in text
+        # Keyword di un solo token senza opzioni: i candidati dell'indice sono già esatti
+        self.exact_candidates = not case_sensitive and not whole_word and self.tokens == [self.folded]
+
+
+class TitleQuery:
+    """Query keyword compilata una volta per applicazione dei filtri"""
+
+    def __init__(self, keywords, exclude_keywords, mode="AND", case_sensitive=False, whole_word=False):
+        self.include = [KeywordMatcher(k, case_sensitive, whole_word) for k in keywords]
+        self.exclude = [KeywordMatcher(k, case_sensitive, whole_word) for k in exclude_keywords]
+        self.mode = mode
+
+    def __bool__(self):
+        return bool(self.include or self.exclude)
+
+
+class TitleIndex:
+    """Indice token → documenti, aggiornabile incrementalmente durante il caricamento
+
+    I documenti sono numerati in ordine di inserimento; ``positions()`` li
+    riporta agli indici di una lista di video.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}  # token -> array('i') di documenti, in ordine crescente
+        self.titles = []  # documento -> titolo originale
+        self.folded_titles = []  # documento -> titolo normalizzato con casefold
+        self._doc_of = {}  # video_id -> documento corrente
+
+    def __len__(self):
+        return len(self.titles)
+
+    def add(self, videos):
+        """Indicizza i video (ignora quelli già presenti con lo stesso titolo)"""
+        with self._lock:
+            for video in videos:
+                doc = self._doc_of.get(video.video_id)
+                if doc is not None and self.titles[doc] == video.title:
+                    continue
+                # Titolo nuovo o cambiato: il vecchio documento resta orfano
+                doc = len(self.titles)
+                folded = video.title.casefold()
+                self.titles.append(video.title)
+                self.folded_titles.append(folded)
+                self._doc_of[video.video_id] = doc
+                for token in set(tokenize(folded)):
+                    postings = self._postings.get(token)
+                    if postings is None:
+                        postings = self._postings[token] = array('i')
+                    postings.append(doc)
+
+    def positions(self, videos):
+        """Array documento → indice in ``videos`` (-1 se il documento non è nella lista)"""
+        with self._lock:
+            doc_positions = np.full(len(self.titles), -1, dtype=np.int64)
+            doc_of = self._doc_of
+            for position, video in enumerate(videos):
+                doc = doc_of.get(video.video_id)
+                if doc is not None:
+                    doc_positions[doc] = position
+        return doc_positions
+
+    def _candidates(self, matcher):
+        """Documenti che possono soddisfare la keyword (None = nessun vincolo ricavabile)"""
+        if not matcher.tokens:
+            return None
+        result = None
+        for token in set(matcher.tokens):
+            if matcher.whole_word:
+                # A parola intera ogni token della keyword è un token completo del titolo
+                matching = [token] if token in self._postings else []
+            else:
+                # Ricerca per sottostringa: token del vocabolario che contengono il token cercato
+                matching = [t for t in self._postings if token in t]
+            if not matching:
+                return np.empty(0, dtype=np.int32)
+            docs = np.unique(np.concatenate([np.frombuffer(self._postings[t], dtype=np.int32)
+                                             for t in matching]))
+            result = docs if result is None else np.intersect1d(result, docs, assume_unique=True)
+            if not len(result):
+                break
+        return result
+
+    def _matching(self, matcher):
+        """Documenti il cui titolo soddisfa la keyword compilata"""
+        candidates = self._candidates(matcher)
+        if candidates is None:
+            candidates = np.arange(len(self.titles))
+        elif matcher.exact_candidates:
+            return candidates
+        texts = self.folded_titles if matcher.use_folded else self.titles
+        test = matcher.test
+        return np.fromiter((doc for doc in candidates if test(texts[doc])), dtype=np.int64)
+
+    def search(self, query, cancelled=None):
+        """Documenti che soddisfano la query: AND/OR tra le keyword meno le esclusioni
+
+        ``cancelled()`` viene controllata tra una keyword e l'altra: se vera la
+        ricerca si interrompe e restituisce None.
+        """
+        with self._lock:
+            result = None
+            for matcher in query.include:
+                if cancelled is not None and cancelled():
+                    return None
+                docs = self._matching(matcher)
+                if result is None:
+                    result = docs
+                elif query.mode == "AND":
+                    result = np.intersect1d(result, docs, assume_unique=True)
+                else:  # OR
+                    result = np.union1d(result, docs)
+                if query.mode == "AND" and not len(result):
+                    break
+            if result is None:
+                result = np.arange(len(self.titles))
+            for matcher in query.exclude:
+                if not len(result):
+                    break
+                if cancelled is not None and cancelled():
+                    return None
+                result = np.setdiff1d(result, self._matching(matcher), assume_unique=True)
+            return result.astype(np.int64)
@@ -0,0 +1,201 @@
+"""Cache persistente su disco dei metadati video, condivisa tra sessioni e canali.
+
+I campi stabili (titolo, durata, data di pubblicazione) e quelli volatili
+(views, like, commenti) hanno scadenze separate: un video con statistiche
+scadute richiede solo un aggiornamento ``part='statistics'``.
+
+Nella stessa base dati sono salvate le pagine di ``search().list`` (100 unità
+di quota ciascuna), con scadenza che cresce con l'età della finestra cercata,
+e i corpi delle risposte con ETag usati dalle richieste condizionali.
+"""
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+
+CACHE_FILE = 'youtube_analyzer_cache.db'
+
+STATIC_TTL = 90 * 24 * 3600  # Titolo, durata, data: cambiano raramente
+STATS_TTL = 2 * 24 * 3600  # Views, like, commenti
+MAX_ENTRIES = 500000
+EVICTION_CHECK_EVERY = 1000  # Scritture tra un controllo di dimensione e l'altro
+MAX_RESPONSES = 20000  # Risposte HTTP con ETag conservate
+
+# Pagine di search: le finestre di date passate non cambiano quasi mai
+SEARCH_TTL_RECENT = 6 * 3600  # Finestre recenti o senza data (es. ordinamento per views)
+SEARCH_TTL_MONTHS = 7 * 24 * 3600  # Finestre chiuse da più di un mese
+SEARCH_TTL_YEARS = 90 * 24 * 3600  # Finestre chiuse da più di un anno
+
+# Stato di un video in cache
+FRESH = 'fresh'  # Utilizzabile senza chiamate API
+STALE_STATS = 'stale_stats'  # Basta ricaricare le statistiche
+
+
+def search_page_ttl(published_before=None):
+    """Scadenza di una pagina di search: più è vecchia la finestra, più a lungo resta valida"""
+    if not published_before:
+        return SEARCH_TTL_RECENT
+    end = datetime.strptime(published_before[:19], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc)
+    age = (datetime.now(timezone.utc) - end).days
+    if age > 365:
+        return SEARCH_TTL_YEARS
+    if age > 30:
+        return SEARCH_TTL_MONTHS
+    return SEARCH_TTL_RECENT
+
+
+class VideoCache:
+    """Cache SQLite indicizzata per video_id con scadenze separate ed eviction LRU"""
+
+    def __init__(self, path=CACHE_FILE, static_ttl=STATIC_TTL, stats_ttl=STATS_TTL,
+                 max_entries=MAX_ENTRIES):
+        self.path = path
+        self.static_ttl = static_ttl
+        self.stats_ttl = stats_ttl
+        self.max_entries = max_entries
+        self._writes = 0
+        # Una sola connessione condivisa tra i thread del loader, serializzata dal lock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript('''
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS videos (
+                video_id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                published_at TEXT NOT NULL,
+                duration_seconds INTEGER NOT NULL,
+                views INTEGER NOT NULL,
+                likes INTEGER NOT NULL,
+                comments INTEGER NOT NULL,
+                static_at REAL NOT NULL,
+                stats_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS videos_used_at ON videos(used_at);
+            CREATE TABLE IF NOT EXISTS search_pages (
+                key TEXT PRIMARY KEY,
+                page TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS http_responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT NOT NULL,
+                body BLOB NOT NULL,
+                used_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS http_responses_used_at ON http_responses(used_at);
+        ''')
+
+    def get_many(self, video_ids):
+        """Restituisce {video_id: (stato, campi)} per i video in cache non scaduti"""
+        now = time.time()
+        found = {}
+        with self._lock:
+            for i in range(0, len(video_ids), 500):
+                chunk = video_ids[i:i+500]
+                rows = self._db.execute(
+                    f"SELECT video_id, title, published_at, duration_seconds, views, likes, comments, "
+                    f"static_at, stats_at FROM videos WHERE video_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for video_id, title, published_at, duration, views, likes, comments, static_at, stats_at in rows:
+                    if now - static_at > self.static_ttl:
+                        continue
+                    state = FRESH if now - stats_at <= self.stats_ttl else STALE_STATS
+                    found[video_id] = (state, {
+                        'title': title,
+                        'published_at': published_at,
+                        'duration_seconds': duration,
+                        'views': views,
+                        'likes': likes,
+                        'comments': comments
+                    })
+            if found:
+                self._db.executemany("UPDATE videos SET used_at = ? WHERE video_id = ?",
+                                     [(now, vid) for vid in found])
+                self._db.commit()
+        return found
+
+    def put_many(self, videos):
+        """Salva video completi: iterabile di dict con gli stessi campi di get_many più video_id"""
+        now = time.time()
+        rows = [(v['video_id'], v['title'], v['published_at'], v['duration_seconds'],
+                 v['views'], v['likes'], v['comments'], now, now, now) for v in videos]
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+            self._writes += len(rows)
+            if self._writes >= EVICTION_CHECK_EVERY:
+                self._writes = 0
+                self._evict()
+
+    def update_stats(self, stats):
+        """Aggiorna solo i campi volatili: iterabile di (video_id, views, likes, comments)"""
+        now = time.time()
+        rows = [(views, likes, comments, now, now, video_id) for video_id, views, likes, comments in stats]
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany("UPDATE videos SET views = ?, likes = ?, comments = ?, stats_at = ?, used_at = ? "
+                                 "WHERE video_id = ?", rows)
+            self._db.commit()
+
+    def get_search_page(self, key):
+        """Pagina di search in cache non scaduta come (scadenza, pagina), oppure None"""
+        with self._lock:
+            row = self._db.execute("SELECT page, expires_at FROM search_pages WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row[1], json.loads(row[0])
+
+    def put_search_page(self, key, page, ttl):
+        """Salva una pagina di search con la scadenza indicata (secondi)"""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO search_pages VALUES (?, ?, ?)",
+                             (key, json.dumps(page), time.time() + ttl))
+            self._db.commit()
+
+    def get_response(self, key):
+        """(etag, corpo) di una risposta HTTP salvata, oppure None"""
+        with self._lock:
+            row = self._db.execute("SELECT etag, body FROM http_responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], zlib.decompress(row[1])
+
+    def put_response(self, key, etag, body):
+        """Salva (compresso) il corpo di una risposta con il suo ETag"""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO http_responses VALUES (?, ?, ?, ?)",
+                             (key, etag, zlib.compress(body, 1), time.time()))
+            self._db.commit()
+            self._writes += 1
+            if self._writes >= EVICTION_CHECK_EVERY:
+                self._writes = 0
+                self._evict()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def _evict(self):
+        """Rimuove i video usati meno di recente oltre ``max_entries``, le pagine di search scadute
+        e le risposte HTTP più vecchie oltre ``MAX_RESPONSES``"""
+        self._db.execute("DELETE FROM search_pages WHERE expires_at <= ?", (time.time(),))
+        self._db.execute("DELETE FROM http_responses WHERE key IN "
+                         "(SELECT key FROM http_responses ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                         (MAX_RESPONSES,))
+        count = self._db.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._db.execute("DELETE FROM videos WHERE video_id IN "
+                             "(SELECT video_id FROM videos ORDER BY used_at LIMIT ?)", (excess,))
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
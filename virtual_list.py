@@ -0,0 +1,141 @@
+"""Lista virtuale su ttk.Treeview.
+
+Il Treeview contiene solo le righe visibili (slot riutilizzati); la scrollbar
+e la rotella spostano una finestra su una sorgente di ``count`` righe e i
+valori vengono formattati solo per le righe mostrate.
+"""
+DEFAULT_ROW_HEIGHT = 20
+WHEEL_ROWS = 3  # Righe per scatto della rotella
+
+
+class VirtualTreeview:
+    """Materializza nel Treeview solo la finestra visibile di ``count`` righe
+
+    ``format_row(riga)`` restituisce ``(testo, valori)`` della riga indicata.
+    """
+
+    def __init__(self, tree, scrollbar, format_row):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.format_row = format_row
+        self.count = 0
+        self.offset = 0  # Prima riga visibile
+        self.selected_row = None
+        self._slots = []  # Item del Treeview riutilizzati per la finestra visibile
+        self._visible = int(tree.cget('height')) or 1
+
+        scrollbar.configure(command=self._on_scrollbar)
+        tree.bind('<Configure>', self._on_configure)
+        tree.bind('<MouseWheel>', self._on_wheel)
+        tree.bind('<Button-4>', lambda e: self._scroll_by(-WHEEL_ROWS))
+        tree.bind('<Button-5>', lambda e: self._scroll_by(WHEEL_ROWS))
+        tree.bind('<<TreeviewSelect>>', self._on_select)
+        tree.bind('<Up>', lambda e: self._move_selection(-1))
+        tree.bind('<Down>', lambda e: self._move_selection(1))
+        tree.bind('<Prior>', lambda e: self._move_selection(-self._visible))
+        tree.bind('<Next>', lambda e: self._move_selection(self._visible))
+        tree.bind('<Home>', lambda e: self._move_selection(-self.count))
+        tree.bind('<End>', lambda e: self._move_selection(self.count))
+
+    def set_count(self, count):
+        """Nuova sorgente di ``count`` righe: torna all'inizio senza selezione"""
+        self.count = count
+        self.offset = 0
+        self.selected_row = None
+        self._render()
+        # La prima volta le misure reali delle righe arrivano solo dopo il disegno
+        self.tree.after_idle(self._on_configure)
+
+    def refresh(self):
+        """Riformatta le righe visibili (dati cambiati sul posto)"""
+        self._render()
+
+    def _max_offset(self):
+        return max(self.count - self._visible, 0)
+
+    def _scroll_to(self, offset):
+        offset = min(max(int(offset), 0), self._max_offset())
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+        return "break"
+
+    def _scroll_by(self, rows):
+        return self._scroll_to(self.offset + rows)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self._scroll_to(float(amount) * self.count)
+        elif action == 'scroll':
+            step = self._visible if unit == 'pages' else 1
+            self._scroll_by(int(amount) * step)
+
+    def _on_wheel(self, event):
+        # Windows: multipli di 120; macOS: valori piccoli
+        steps = event.delta // 120 if abs(event.delta) >= 120 else (1 if event.delta > 0 else -1)
+        return self._scroll_by(-steps * WHEEL_ROWS)
+
+    def _on_configure(self, event=None):
+        """Ricalcola quante righe entrano nel Treeview"""
+        header, row_height = 0, DEFAULT_ROW_HEIGHT
+        bbox = self.tree.bbox(self._slots[0]) if self._slots else None
+        if bbox:
+            header, row_height = bbox[1], bbox[3]
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return
+        visible = max((height - header) // row_height, 1)
+        if visible != self._visible:
+            self._visible = visible
+            self.offset = min(self.offset, self._max_offset())
+            self._render()
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self._slots:
+            self.selected_row = self.offset + self._slots.index(selection[0])
+        elif not selection and self.selected_row is not None and \
+                self.offset <= self.selected_row < self.offset + len(self._slots):
+            # Deselezione dell'utente (non dovuta allo scorrimento)
+            self.selected_row = None
+
+    def _move_selection(self, delta):
+        """Sposta la selezione con la tastiera, scorrendo la finestra se serve"""
+        if not self.count:
+            return "break"
+        row = self.offset if self.selected_row is None else self.selected_row + delta
+        row = min(max(row, 0), self.count - 1)
+        self.selected_row = row
+        if row < self.offset:
+            self.offset = row
+        elif row >= self.offset + self._visible:
+            self.offset = row - self._visible + 1
+        self._render()
+        return "break"
+
+    def _render(self):
+        """Allinea gli slot alla finestra visibile e aggiorna la scrollbar"""
+        tree = self.tree
+        rows = min(self._visible, max(self.count - self.offset, 0))
+        while len(self._slots) < rows:
+            self._slots.append(tree.insert('', 'end'))
+        if len(self._slots) > rows:
+            tree.delete(*self._slots[rows:])
+            del self._slots[rows:]
+
+        for slot, iid in enumerate(self._slots):
+            text, values = self.format_row(self.offset + slot)
+            tree.item(iid, text=text, values=values)
+
+        # La selezione segue la riga, non lo slot
+        slot = None if self.selected_row is None else self.selected_row - self.offset
+        if slot is not None and 0 <= slot < len(self._slots):
+            tree.selection_set(self._slots[slot])
+            tree.focus(self._slots[slot])
+        elif tree.selection():
+            tree.selection_remove(*tree.selection())
+
+        if self.count:
+            self.scrollbar.set(self.offset / self.count, (self.offset + rows) / self.count)
+        else:
+            self.scrollbar.set(0, 1)